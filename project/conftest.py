@@ -0,0 +1,15 @@
+import os
+
+# Settings read these from the environment of the containers
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+os.environ.setdefault("SECRET_KEY", "tests")
+os.environ.setdefault("DJANGO_ALLOWED_HOSTS", "localhost testserver")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+os.environ.setdefault("CELERY_BROKER", "memory://")
+os.environ.setdefault("CELERY_BACKEND", "cache+memory://")
+
+
+def pytest_configure():
+    import django
+
+    django.setup()
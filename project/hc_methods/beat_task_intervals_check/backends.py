@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 from health_check.backends import BaseHealthCheckBackend
 from datetime import datetime, timedelta
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils import timezone
 
 import celery
@@ -8,9 +12,10 @@ from health_check.exceptions import (
     HealthCheckException,
 )
 from django.conf import settings
-from django_celery_beat.models import PeriodicTask
+from django.db import connection
 
-from ..storages import HealthcheckStorage
+from ..storages import HashHealthcheckStorage, get_healthcheck_storage
+from .schedules import QueryCounter, ScheduleRecord, schedule_cache
 
 from loguru import logger
 
@@ -18,60 +23,108 @@ TTL = timedelta(seconds=settings.HEALTHCHECK_STORAGE_TTL)
 INTERVAL = timedelta(seconds=settings.HEALTHCHECK_PROBE_INTERVAL)
 
 
-class BeatHealthCheckBase(BaseHealthCheckBackend):
-    @property
-    def active_tasks(self):
-        return PeriodicTask.objects.filter(enabled=True).exclude(last_run_at=None)
+@lru_cache(maxsize=None)
+def get_sync_interval() -> timedelta:
+    """
+    Instantiating the scheduler loads the whole schedule from the database,
+    so the effective sync interval is computed once per process.
+    """
+    # 0 means sync is performed with intervals of N seconds
+    # (180 by default)
+    beat_sync_every = getattr(settings, "CELERYBEAT_SYNC_EVERY", 0)
 
-    @property
-    def sync_interval(self) -> timedelta:
-        # 0 means sync is performed with intervals of N seconds
-        # (180 by default)
-        beat_sync_every = getattr(settings, "CELERYBEAT_SYNC_EVERY", 0)
-
-        if not beat_sync_every:
-            return timedelta(
-                seconds=Service(celery.current_app).get_scheduler().sync_every
-            )
-        else:
-            return timedelta()
-
-    def _get_last_run_realtime(self, task_name: str) -> datetime:
-        storage = HealthcheckStorage()
-        logger.info(f"Getting timestamp for task {task_name}: {storage.get(task_name)}")
-        return storage.get(task_name)
-
-    def check_interval_lazy(self, periodic_task: PeriodicTask) -> bool:
-        return periodic_task.schedule.now() < (
-            periodic_task.last_run_at
-            + periodic_task.schedule.run_every
-            + self.sync_interval
+    if not beat_sync_every:
+        return timedelta(
+            seconds=Service(celery.current_app).get_scheduler().sync_every
         )
+    else:
+        return timedelta()
 
-    def check_interval_realtime(self, periodic_task: PeriodicTask) -> bool:
-        last_run_at = self._get_last_run_realtime(periodic_task.task)
 
-        # Record removed from redis, but interval is less than ttl
-        if not last_run_at and periodic_task.schedule.run_every < TTL:
-            return False
+@receiver(setting_changed)
+def reset_sync_interval(*, setting, **kwargs):
+    if setting in ("CELERYBEAT_SYNC_EVERY", "CELERY_BEAT_SCHEDULER"):
+        get_sync_interval.cache_clear()
 
-        # Fallback in case last record might be missing because of short TTL
-        if not last_run_at and periodic_task.schedule.run_every > TTL:
-            return self.check_interval_lazy(periodic_task)
 
-        return timezone.now() < (
-            last_run_at + periodic_task.schedule.run_every + INTERVAL
-        )
+class BeatHealthCheckBase(BaseHealthCheckBackend):
+    #: Number of database queries made by the last run of the check.
+    query_count = 0
 
-    def check_remaining_estimate(self, periodic_task: PeriodicTask) -> bool:
-        last_run_at = (
-            self._get_last_run_realtime(periodic_task.task) or periodic_task.last_run_at
+    @property
+    def active_tasks(self) -> list[ScheduleRecord]:
+        return schedule_cache.get()
+
+    @property
+    def sync_interval(self) -> timedelta:
+        return get_sync_interval()
+
+    def run_check(self):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            super().run_check()
+        self.query_count = counter.count
+        logger.debug(f"{self.identifier()} made {self.query_count} queries")
+
+    def _get_last_runs_realtime(self, task_names) -> dict[str, datetime | None]:
+        storage = get_healthcheck_storage(
+            HashHealthcheckStorage.Category.tasks, ttl=settings.HEALTHCHECK_STORAGE_TTL
         )
+        last_runs = storage.get_many(set(task_names))
+        logger.info(f"Getting timestamps for tasks: {last_runs}")
+        return last_runs
+
+    def check_interval_lazy(self, record: ScheduleRecord, now: datetime) -> bool:
+        return now < record.last_run_at + record.run_every + self.sync_interval
+
+    def check_interval_realtime(
+        self, record: ScheduleRecord, last_run_at: datetime | None, now: datetime
+    ) -> bool:
+        if not last_run_at:
+            # Record removed from redis, but interval is less than ttl
+            if record.run_every < TTL:
+                return False
+            # Fallback in case last record might be missing because of short TTL
+            return self.check_interval_lazy(record, now)
+
+        return now < last_run_at + record.run_every + INTERVAL
+
+    def check_remaining_estimate(
+        self, record: ScheduleRecord, last_run_at: datetime | None
+    ) -> bool:
+        last_run_at = last_run_at or record.last_run_at
+
+        return timedelta() < record.schedule.remaining_estimate(last_run_at) + INTERVAL
+
+    def check_record(
+        self, record: ScheduleRecord, last_run_at: datetime | None, now: datetime
+    ) -> bool:
+        raise NotImplementedError
+
+    def needs_realtime(self, record: ScheduleRecord) -> bool:
+        """
+        Whether checking the record takes its last run from Redis.
+        """
+        return True
 
-        return (
-            timedelta()
-            < periodic_task.schedule.remaining_estimate(last_run_at) + INTERVAL
+    def check_status(self):
+        records = self.active_tasks
+        # All the timestamps are fetched in one round trip, so the cost
+        # does not grow with the number of periodic tasks.
+        last_runs = self._get_last_runs_realtime(
+            record.task for record in records if self.needs_realtime(record)
         )
+        now = timezone.now()
+
+        failed = [
+            record.task
+            for record in records
+            if not self.check_record(record, last_runs.get(record.task), now)
+        ]
+        for task in failed:
+            self.add_error(
+                HealthCheckException(f"Sheduled task {task} has not run for too long")
+            )
 
 
 class LazyBeatTasksHealthCheck(BeatHealthCheckBase):
@@ -79,22 +132,14 @@ class LazyBeatTasksHealthCheck(BeatHealthCheckBase):
     #: even if the check errors.
     critical_service = False
 
-    def check_status(self):
-        for periodic_task in self.active_tasks:
-            try:
-                periodic_task.schedule.run_every
-            except AttributeError:
-                check = self.check_remaining_estimate(periodic_task)
-            else:
-                check = self.check_interval_lazy(periodic_task)
-
-            if not check:
-                self.add_error(
-                    HealthCheckException(
-                        f"Sheduled task {periodic_task.task} has not run "
-                        f"for too long"
-                    )
-                )
+    def needs_realtime(self, record):
+        # Interval tasks are checked against the database alone
+        return record.run_every is None
+
+    def check_record(self, record, last_run_at, now):
+        if record.run_every is None:
+            return self.check_remaining_estimate(record, last_run_at)
+        return self.check_interval_lazy(record, now)
 
 
 class BeatTasksHealthCheck(BeatHealthCheckBase):
@@ -102,19 +147,7 @@ class BeatTasksHealthCheck(BeatHealthCheckBase):
     #: even if the check errors.
     critical_service = False
 
-    def check_status(self):
-        for periodic_task in self.active_tasks:
-            try:
-                periodic_task.schedule.run_every
-            except AttributeError:
-                check = self.check_remaining_estimate(periodic_task)
-            else:
-                check = self.check_interval_realtime(periodic_task)
-
-            if not check:
-                self.add_error(
-                    HealthCheckException(
-                        f"Sheduled task {periodic_task.task} has not run "
-                        f"for too long"
-                    )
-                )
+    def check_record(self, record, last_run_at, now):
+        if record.run_every is None:
+            return self.check_remaining_estimate(record, last_run_at)
+        return self.check_interval_realtime(record, last_run_at, now)
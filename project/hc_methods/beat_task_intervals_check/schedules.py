@@ -0,0 +1,122 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django_celery_beat.models import PeriodicTask, PeriodicTasks
+
+
+class ScheduleRecord:
+    """
+    Compact, already resolved view of a periodic task, holding only what
+    the beat checks need.
+    """
+
+    __slots__ = ("task", "last_run_at", "schedule", "run_every")
+
+    def __init__(self, task: str, last_run_at: datetime, schedule):
+        self.task = task
+        self.last_run_at = last_run_at
+        self.schedule = schedule
+        # Only interval schedules have a fixed period
+        self.run_every: timedelta | None = getattr(schedule, "run_every", None)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.task}>"
+
+
+def load_schedules() -> dict[int, tuple[str, object]]:
+    """
+    Loads the schedules of all the enabled periodic tasks in a single query,
+    by primary key.
+    """
+    periodic_tasks = PeriodicTask.objects.filter(enabled=True).select_related(
+        "interval", "crontab", "solar", "clocked"
+    )
+    return {
+        periodic_task.pk: (periodic_task.task, periodic_task.schedule)
+        for periodic_task in periodic_tasks
+    }
+
+
+class ScheduleCache:
+    """
+    In-process cache of the compiled schedules of the periodic tasks. They
+    are reloaded only when django_celery_beat's `PeriodicTasks.last_update`
+    change marker moves, which happens whenever a periodic task is edited.
+    Within the freshness window the marker is not queried at all.
+
+    Beat saves the last runs without moving the marker, so `last_run_at` is
+    read anew on every call, with a single query.
+    """
+
+    def __init__(self, freshness: float = 0):
+        self.freshness = freshness
+        self._lock = threading.Lock()
+        self._schedules: dict[int, tuple[str, object]] | None = None
+        self._last_change: datetime | None = None
+        self._checked_at = 0.0
+
+    def _get_schedules(self, reload: bool = False) -> dict[int, tuple[str, object]]:
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not reload
+                and self._schedules is not None
+                and now - self._checked_at < self.freshness
+            ):
+                return self._schedules
+
+            last_change = PeriodicTasks.last_change()
+            # No marker means no changes have been tracked yet, nothing to
+            # compare against
+            if (
+                reload
+                or self._schedules is None
+                or last_change is None
+                or last_change != self._last_change
+            ):
+                self._schedules = load_schedules()
+                self._last_change = last_change
+            self._checked_at = now
+            return self._schedules
+
+    def get(self) -> list[ScheduleRecord]:
+        last_runs = list(
+            PeriodicTask.objects.filter(enabled=True)
+            .exclude(last_run_at=None)
+            .values_list("pk", "last_run_at")
+        )
+        schedules = self._get_schedules()
+        if any(pk not in schedules for pk, _ in last_runs):
+            # Enabled since the schedules were loaded
+            schedules = self._get_schedules(reload=True)
+
+        records = []
+        for pk, last_run_at in last_runs:
+            if pk in schedules:
+                task, schedule = schedules[pk]
+                records.append(ScheduleRecord(task, last_run_at, schedule))
+        return records
+
+    def invalidate(self):
+        with self._lock:
+            self._schedules = None
+
+
+schedule_cache = ScheduleCache(
+    freshness=getattr(settings, "HEALTHCHECK_BEAT_SCHEDULE_FRESHNESS", 0)
+)
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries made while installed.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
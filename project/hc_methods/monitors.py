@@ -1,5 +1,7 @@
+import random
 import threading
 import time
+from datetime import datetime, timezone as dt_timezone
 from pprint import pformat
 from main import celery_app
 from celery import bootsteps, Celery
@@ -9,64 +11,145 @@ from django.utils import timezone
 
 from celery.events.snapshot import Polaroid
 
-from hc_methods.storages import HealthcheckStorage, HealthCheckFiles
+from hc_methods.receivers import FilteredEventReceiver
+from hc_methods.state import HEALTH_EVENTS, HealthState, WorkerLiveness
+from hc_methods.storages import (
+    HashHealthcheckStorage,
+    HealthCheckFiles,
+    HealthcheckStorage,
+    HealthRecordNotFound,
+    WriteBehindBuffer,
+    get_healthcheck_storage,
+    get_heartbeat_storage,
+)
 
 from loguru import logger
 
+Category = HashHealthcheckStorage.Category
+
 
 class EventsCamera(Polaroid):
     clear_after = True  # clear after flush (incl, state.event_count).
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Kept between snapshots to know what has already been written
+        self.workers_buffer = self._buffer(Category.workers)
+        if isinstance(self.workers_buffer.storage, HealthcheckStorage):
+            # The "keys" layout shares one keyspace between the categories,
+            # so a single buffer writes the whole snapshot in one round trip
+            self.tasks_buffer = self.workers_buffer
+        else:
+            self.tasks_buffer = self._buffer(Category.tasks)
+
+    @staticmethod
+    def _buffer(category: Category) -> WriteBehindBuffer:
+        return WriteBehindBuffer(
+            get_healthcheck_storage(category, ttl=settings.HEALTHCHECK_STORAGE_TTL),
+            resolution=getattr(settings, "HEALTHCHECK_STORAGE_RESOLUTION", 1),
+        )
+
     def on_shutter(self, state):
         if not state.event_count:
             # No new events since last snapshot.
             return
 
-        redis = HealthcheckStorage(ttl=settings.HEALTHCHECK_STORAGE_TTL)
-
         logger.debug(f"{state.tasks=}")
         logger.debug(f"{state.workers=}")
 
         for worker in state.workers.values():
             logger.info(f"{worker.hostname} is alive")
-            redis.set(worker.hostname)
+            self.workers_buffer.update(worker.hostname, self._seen_at(worker))
 
         for task in state.tasks.values():
             logger.info(f"{task.name}")
-            redis.set(task.name)
+            if task.name:
+                self.tasks_buffer.update(task.name, self._seen_at(task))
+
+        # Only the keys that moved enough are written, in one batch per buffer
+        written = self.workers_buffer.flush()
+        if self.tasks_buffer is not self.workers_buffer:
+            written.update(self.tasks_buffer.flush())
+        logger.debug(f"{len(written)} health records written")
+
+    def on_cleanup(self):
+        for buffer in {self.workers_buffer, self.tasks_buffer}:
+            buffer.storage.prune()
+
+    @staticmethod
+    def _seen_at(record) -> datetime:
+        # Records of `HealthState` or `celery.events.State`
+        seen_at = (
+            getattr(record, "last_heartbeat", None)
+            or getattr(record, "last_seen", None)
+            or getattr(record, "timestamp", None)
+            or time.time()
+        )
+        return datetime.fromtimestamp(seen_at, tz=dt_timezone.utc)
 
 
 class LivenessProbe(bootsteps.StartStopStep):
     """
     A hook for workers. Periodically Updates the timestamp of a temp file
     as long as the worker is alive.
+
+    Unless HEALTHCHECK_WORKER_HEARTBEAT_INTERVAL is set, the interval is
+    derived from HEALTHCHECK_WORKER_TIMEOUT so that a live worker refreshes
+    its record several times before it is considered inactive.
     """
 
     requires = {"celery.worker.components:Timer"}
 
+    #: Share of the worker timeout between two heartbeats.
+    timeout_share = 1 / 3
+    #: Relative spread of the interval, so workers restarted together
+    #: do not write in lockstep.
+    jitter = 0.1
+
     def __init__(self, worker, **kwargs):
         self.requests = []
         self.tref = None
-        self.heartbeat_storage = HealthCheckFiles(
-            category=HealthCheckFiles.Category.alive
-        )
+        self.heartbeat_storage = get_heartbeat_storage()
+        self.interval = self.get_interval()
+        self.last_heartbeat = None
+
+    def get_interval(self) -> float:
+        interval = getattr(settings, "HEALTHCHECK_WORKER_HEARTBEAT_INTERVAL", None)
+        if interval is None:
+            interval = settings.HEALTHCHECK_WORKER_TIMEOUT * self.timeout_share
+        return interval * random.uniform(1 - self.jitter, 1)
 
     def start(self, worker):
+        self.update_heartbeat_file(worker)
         self.tref = worker.timer.call_repeatedly(
-            1.0,
+            self.interval,
             self.update_heartbeat_file,
             (worker,),
             priority=10,
         )
 
     def stop(self, worker):
+        if self.tref:
+            self.tref.cancel()
         self.heartbeat_storage.delete(worker.hostname)
 
     def update_heartbeat_file(self, worker):
+        now = time.monotonic()
+        # Timer calls may bunch up after the worker was blocked,
+        # a heartbeat written moments ago is still good enough.
+        if (
+            self.last_heartbeat is not None
+            and now - self.last_heartbeat < self.interval / 2
+        ):
+            return
         self.heartbeat_storage.set(worker.hostname)
+        self.last_heartbeat = now
 
 
-celery_app.steps["worker"].add(LivenessProbe)
+# With the "events" backend liveness comes from the workers own heartbeat
+# events, see `RealtimeMonitor`.
+if getattr(settings, "HEALTHCHECK_HEARTBEAT_BACKEND", "files") != "events":
+    celery_app.steps["worker"].add(LivenessProbe)
 
 
 @worker_ready.connect
@@ -74,6 +157,8 @@ def worker_ready_callback(**kwargs):
     worker = kwargs.get("sender")
     logger.info(f"Worker is ready {worker}")
     HealthCheckFiles(category=HealthCheckFiles.Category.ready).set(worker.hostname)
+    if getattr(settings, "HEALTHCHECK_STORAGE_LAYOUT", "keys") == "hash":
+        HashHealthcheckStorage(category=Category.ready).set(worker.hostname)
 
 
 @worker_shutdown.connect
@@ -81,6 +166,8 @@ def worker_shutdown_callback(**kwargs):
     logger.info(f"Worker is shutting down {kwargs}")
     worker = kwargs.get("sender")
     HealthCheckFiles(category=HealthCheckFiles.Category.ready).delete(worker.hostname)
+    if getattr(settings, "HEALTHCHECK_STORAGE_LAYOUT", "keys") == "hash":
+        HashHealthcheckStorage(category=Category.ready).delete(worker.hostname)
 
 
 class LoggerCam(Polaroid):
@@ -96,58 +183,156 @@ class LoggerCam(Polaroid):
 
 
 class RealtimeMonitor(threading.Thread):
-    def __init__(self, app: Celery, freq: int):
-        threading.Thread.__init__(self)
+    """
+    Consumes Celery events in a background thread and keeps the last
+    heartbeat of every worker in memory, so workers liveness can be checked
+    without touching the filesystem or the broker.
+
+    `liveness` values are immutable and replaced as a whole on every event,
+    readers do not need a lock.
+    """
+
+    def __init__(
+        self, app: Celery, freq: int, node_id: str | None = "app_event_receiver"
+    ):
+        threading.Thread.__init__(self, daemon=True)
         self.app = app
         self.try_interval = freq
-        self.state = app.events.State()
+        self.node_id = node_id
+        self.state = HealthState()
+        self.liveness: dict[str, WorkerLiveness] = {}
+        self.started_at = time.monotonic()
+        self._pruned_at = self.started_at
         logger.info(f"Initialized {self}")
 
+    @property
+    def warming_up(self) -> bool:
+        """
+        Workers may be missing until each of them had a chance to send
+        a heartbeat after the monitor has started.
+        """
+        return time.monotonic() - self.started_at < settings.HEALTHCHECK_WORKER_TIMEOUT
+
+    def _update_liveness(self, event, online=True):
+        hostname = event["hostname"]
+        self.liveness[hostname] = WorkerLiveness(
+            hostname=hostname,
+            last_heartbeat=event.get("local_received") or time.time(),
+            processed=event.get("processed", 0),
+            active=event.get("active", 0),
+            online=online,
+        )
+        self._prune_liveness()
+
+    def _prune_liveness(self):
+        # Workers gone for longer than the storage TTL are forgotten,
+        # the map is swapped as a whole so readers never see it changing.
+        now = time.monotonic()
+        ttl = settings.HEALTHCHECK_STORAGE_TTL
+        if now - self._pruned_at < ttl:
+            return
+        self._pruned_at = now
+        deadline = time.time() - ttl
+        self.liveness = {
+            hostname: worker
+            for hostname, worker in self.liveness.items()
+            if worker.last_heartbeat > deadline
+        }
+
     def _on_task_start(self, event):
-        task = self.state.tasks.get(event["uuid"])
-        logger.debug(f"Task {task.name} has launched")
+        self.state.event(event)
+        logger.debug(f"Task {self.state.task_name(event['uuid'])} has launched")
 
     def _on_worker_online(self, event):
-        worker = self.state.workers.get(event["uuid"])
-        logger.debug(f"Task {worker.hostname} has launched")
+        self.state.event(event)
+        self._update_liveness(event)
+        logger.debug(f"Worker {event['hostname']} has launched")
 
     def _on_worker_heartbeat(self, event):
-        worker = self.state.workers.get(event["uuid"])
-        logger.debug(f"Worker {worker.hostname} has sent heartbeat")
+        self.state.event(event)
+        self._update_liveness(event)
+        logger.debug(f"Worker {event['hostname']} has sent heartbeat")
 
     def _on_worker_offline(self, event):
-        worker = self.state.workers.get(event["uuid"])
-        logger.debug(f"Worker {worker.hostname} has gone offline")
+        self.state.event(event)
+        self._update_liveness(event, online=False)
+        logger.debug(f"Worker {event['hostname']} has gone offline")
+
+    def get(self, hostname: str) -> datetime:
+        worker = self.liveness.get(hostname)
+        if worker is None or not worker.online:
+            raise HealthRecordNotFound(hostname)
+        return datetime.fromtimestamp(worker.last_heartbeat, tz=dt_timezone.utc)
+
+    def scan(self) -> dict[str, datetime]:
+        """
+        Returns the time of the last heartbeat of every online worker.
+        """
+        return {
+            worker.hostname: datetime.fromtimestamp(
+                worker.last_heartbeat, tz=dt_timezone.utc
+            )
+            for worker in list(self.liveness.values())
+            if worker.online
+        }
 
     def run(self):
         logger.info(f"{self.__class__.__name__} has run")
         while True:
             try:
                 with self.app.connection() as conn:
-                    recv = self.app.events.Receiver(
-                        conn,
-                        handlers={
+                    handlers = {
+                        event_type: self.state.event for event_type in HEALTH_EVENTS
+                    }
+                    handlers.update(
+                        {
                             "task-started": self._on_task_start,
                             "worker-online": self._on_worker_online,
                             "worker-heartbeat": self._on_worker_heartbeat,
                             "worker-offline": self._on_worker_offline,
-                            "*": self.state.event,
-                        },
+                        }
+                    )
+                    recv = FilteredEventReceiver(
+                        conn,
+                        event_types=handlers,
+                        handlers=handlers,
                         # При масштабировании пользоваться одной очередью
-                        node_id="app_event_receiver",
+                        node_id=self.node_id,
+                        app=self.app,
                     )
                     recv.capture(limit=None, timeout=None, wakeup=True)
             except (SystemExit, KeyboardInterrupt):
-                self.join()
+                return
             except Exception as e:
                 logger.error(f"No events, trying again in {self.try_interval} seconds")
                 time.sleep(self.try_interval)
 
 
+_realtime_monitor: RealtimeMonitor | None = None
+_realtime_monitor_lock = threading.Lock()
+
+
+def get_realtime_monitor() -> RealtimeMonitor:
+    """
+    Returns the process-wide monitor used as a source of workers liveness,
+    starting it on the first call. Every process gets its own event queue,
+    as each of them needs the heartbeats of all the workers.
+    """
+    global _realtime_monitor
+
+    with _realtime_monitor_lock:
+        if _realtime_monitor is None:
+            _realtime_monitor = RealtimeMonitor(celery_app, freq=1, node_id=None)
+            _realtime_monitor.start()
+    return _realtime_monitor
+
+
 __all__ = [
     "EventsCamera",
     "LivenessProbe",
     "worker_ready_callback",
     "worker_shutdown_callback",
     "RealtimeMonitor",
+    "WorkerLiveness",
+    "get_realtime_monitor",
 ]
@@ -1,72 +1,88 @@
-from celery.exceptions import TaskRevokedError, TimeoutError
-from celery import current_app as app
 from django.conf import settings
+from redis.exceptions import RedisError
 
 from health_check.backends import BaseHealthCheckBackend
 from health_check.exceptions import (
-    ServiceReturnedUnexpectedResult,
     ServiceUnavailable,
+    ServiceWarning,
     HealthCheckException,
 )
 
-from .tasks import add
+from .depth import QueueDepth
+from .shared import active_queues, queue_depths, queue_probes
 
 
 class QueueCheck(BaseHealthCheckBackend):
-    timeout = getattr(settings, "HEALTHCHECK_CELERY_TIMEOUT", 3)
-    result_timeout = getattr(settings, "HEALTHCHECK_CELERY_RESULT_TIMEOUT", timeout)
-    queue_timeout = getattr(settings, "HEALTHCHECK_CELERY_QUEUE_TIMEOUT", timeout)
+    max_depth = getattr(settings, "HEALTHCHECK_QUEUE_MAX_DEPTH", None)
+    max_lag = getattr(settings, "HEALTHCHECK_QUEUE_MAX_LAG", None)
+    max_growth = getattr(settings, "HEALTHCHECK_QUEUE_MAX_GROWTH", None)
+
+    #: Round trip of the probe task, seconds.
+    latency: float | None = None
+    #: Backlog of the queue, when the broker allows to measure it.
+    depth: QueueDepth | None = None
+
+    def pretty_status(self):
+        status = super().pretty_status()
+        if self.errors or self.latency is None:
+            return status
+        return f"{status}, probe took {self.latency:.3f}s"
 
     def check_status(self):
         self._check_active()
+        self._check_depth()
         self._check_goes_through()
 
     def _check_active(self):
-        active_queues = [
-            queue["name"]
-            for values in app.control.inspect().active_queues().values()
-            for queue in values
+        # One inspection serves the checks of all the queues
+        active_queue_names = [
+            queue["name"] for values in active_queues().values() for queue in values
         ]
-        if self.queue not in active_queues:
+        if self.queue not in active_queue_names:
             self.add_error(
                 HealthCheckException(
-                    f"The queue is not among the active queues:{active_queues}"
+                    f"The queue is not among the active queues:{active_queue_names}"
                 )
             )
 
-    def _check_goes_through(self):
+    def _check_depth(self):
         try:
-            result = add.apply_async(
-                args=[4, 4], expires=self.queue_timeout, queue=self.queue
-            )
-            result.get(timeout=self.result_timeout)
-            if result.result != 8:
-                self.add_error(
-                    ServiceReturnedUnexpectedResult("Celery returned wrong result")
-                )
-        except IOError as e:
-            self.add_error(ServiceUnavailable("IOError"), e)
-        except NotImplementedError as e:
+            self.depth = queue_depths().get(self.queue)
+        except RedisError as e:
+            # The depth is advisory, the probe still tells if the queue works
+            self.add_error(ServiceWarning(f"Can not measure the queue depth: {e}"), e)
+            return
+        if self.depth is None:
+            return
+
+        if self.max_depth is not None and self.depth.depth > self.max_depth:
             self.add_error(
-                ServiceUnavailable(
-                    "NotImplementedError: Make sure CELERY_RESULT_BACKEND is set"
-                ),
-                e,
+                ServiceWarning(
+                    f"{self.depth.depth} messages are waiting in the queue, "
+                    f"more than {self.max_depth}"
+                )
             )
-        except TaskRevokedError as e:
+        if self.max_lag is not None and self.depth.lag > self.max_lag:
             self.add_error(
-                ServiceUnavailable(
-                    "TaskRevokedError: The task was revoked, likely because it spent "
-                    "too long in the queue"
-                ),
-                e,
+                ServiceWarning(
+                    f"The oldest message has been waiting for {self.depth.lag:.0f} "
+                    f"seconds, more than {self.max_lag}"
+                )
             )
-        except TimeoutError as e:
+        if self.max_growth is not None and self.depth.growth > self.max_growth:
             self.add_error(
-                ServiceUnavailable(
-                    "TimeoutError: The task took too long to return a result"
-                ),
-                e,
+                ServiceWarning(
+                    f"The queue grows by {self.depth.growth:.1f} messages "
+                    f"per second, more than {self.max_growth}"
+                )
             )
-        except BaseException as e:
-            self.add_error(ServiceUnavailable("Unknown error"), e)
+
+    def _check_goes_through(self):
+        # The queues are probed all at once, for the checks of all of them
+        probe = queue_probes().get(self.queue)
+        if probe is None:
+            self.add_error(ServiceUnavailable("The queue has not been probed"))
+        elif probe.error:
+            self.add_error(probe.error, probe.cause)
+        else:
+            self.latency = probe.latency
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Iterable, NamedTuple
+from urllib.parse import urlsplit
+
+from redis import Redis
+
+from ..storages import get_connection_pool
+
+
+class QueueDepth(NamedTuple):
+    #: Messages waiting in the queue.
+    depth: int
+    #: Seconds the oldest message has been waiting at least, as observed by
+    #: the consecutive measurements.
+    lag: float
+    #: Change of the depth over the trend window, messages per second.
+    growth: float
+
+
+class QueueDepthMonitor:
+    """
+    Measures the backlog of queues on a Redis broker, where every queue is
+    a list consumed from its tail. Depths and the oldest messages of all the
+    queues are read in one pipelined round trip.
+
+    Messages carry no publish time, so the lag of a queue is the time its
+    oldest message has been seen at the tail of the list.
+    """
+
+    def __init__(self, broker_url: str, trend_window: float = 60):
+        parts = urlsplit(broker_url)
+        self.client = Redis(
+            connection_pool=get_connection_pool(
+                db=int(parts.path.strip("/") or 0),
+                url=f"{parts.scheme}://{parts.netloc}",
+            )
+        )
+        self.trend_window = trend_window
+        self._lock = threading.Lock()
+        # queue -> (delivery tag of the oldest message, first seen at)
+        self._oldest: dict[str, tuple[str, float]] = {}
+        # queue -> (measured at, depth)
+        self._history: dict[str, deque] = {}
+
+    def measure(self, queues: Iterable[str]) -> dict[str, QueueDepth]:
+        queues = list(queues)
+        pipe = self.client.pipeline(transaction=False)
+        for queue in queues:
+            pipe.llen(queue)
+            pipe.lindex(queue, -1)
+        values = pipe.execute()
+        now = time.monotonic()
+
+        with self._lock:
+            return {
+                queue: QueueDepth(
+                    depth=depth,
+                    lag=self._lag(queue, oldest, now),
+                    growth=self._growth(queue, depth, now),
+                )
+                for queue, depth, oldest in zip(queues, values[::2], values[1::2])
+            }
+
+    def _lag(self, queue: str, oldest: bytes | None, now: float) -> float:
+        if oldest is None:
+            self._oldest.pop(queue, None)
+            return 0.0
+        try:
+            tag = json.loads(oldest)["properties"]["delivery_tag"]
+        except (ValueError, KeyError, TypeError):
+            tag = oldest
+        seen_tag, seen_at = self._oldest.get(queue, (None, now))
+        if seen_tag != tag:
+            self._oldest[queue] = (tag, now)
+            return 0.0
+        return now - seen_at
+
+    def _growth(self, queue: str, depth: int, now: float) -> float:
+        history = self._history.setdefault(queue, deque())
+        history.append((now, depth))
+        while history and now - history[0][0] > self.trend_window:
+            history.popleft()
+        first_at, first_depth = history[0]
+        if now == first_at:
+            return 0.0
+        return (depth - first_depth) / (now - first_at)
+
+
+def is_redis_broker(broker_url: str | None) -> bool:
+    return bool(broker_url) and urlsplit(broker_url).scheme in ("redis", "rediss")
@@ -0,0 +1,97 @@
+import time
+from typing import Iterable, NamedTuple
+
+from celery.exceptions import TaskRevokedError, TimeoutError
+from celery.result import ResultSet
+from health_check.exceptions import (
+    HealthCheckException,
+    ServiceReturnedUnexpectedResult,
+    ServiceUnavailable,
+)
+from loguru import logger
+
+from .tasks import add
+
+
+class ProbeResult(NamedTuple):
+    #: Seconds between sending the probe task and getting its result.
+    latency: float | None = None
+    error: HealthCheckException | None = None
+    cause: BaseException | None = None
+
+
+def _unavailable(message: str, cause: BaseException) -> ProbeResult:
+    return ProbeResult(error=ServiceUnavailable(message), cause=cause)
+
+
+def _from_value(value, latency: float) -> ProbeResult:
+    if isinstance(value, TaskRevokedError):
+        return _unavailable(
+            "TaskRevokedError: The task was revoked, likely because it spent "
+            "too long in the queue",
+            value,
+        )
+    if isinstance(value, BaseException):
+        return _unavailable("Unknown error", value)
+    if value != 8:
+        return ProbeResult(
+            latency=latency,
+            error=ServiceReturnedUnexpectedResult("Celery returned wrong result"),
+        )
+    return ProbeResult(latency=latency)
+
+
+def probe_queues(
+    queues: Iterable[str], result_timeout: float, queue_timeout: float
+) -> dict[str, ProbeResult]:
+    """
+    Sends a probe task to every queue at once and waits for all the results
+    together, so the whole probe takes as long as the slowest queue rather
+    than the sum of them.
+    """
+    probes: dict[str, ProbeResult] = {}
+    sent: dict[str, tuple[str, float]] = {}
+
+    for queue in queues:
+        try:
+            result = add.apply_async(args=[4, 4], expires=queue_timeout, queue=queue)
+        except IOError as e:
+            probes[queue] = _unavailable("IOError", e)
+        else:
+            sent[result.id] = (queue, time.monotonic())
+
+    def on_result(task_id, value):
+        queue, sent_at = sent[task_id]
+        probes[queue] = _from_value(value, time.monotonic() - sent_at)
+
+    result_set = ResultSet([add.AsyncResult(task_id) for task_id in sent])
+    if result_set.supports_native_join:
+        join = result_set.join_native
+    else:
+        join = result_set.join
+    try:
+        join(timeout=result_timeout, propagate=False, callback=on_result)
+    except TimeoutError as e:
+        pending = _unavailable(
+            "TimeoutError: The task took too long to return a result", e
+        )
+    except IOError as e:
+        pending = _unavailable("IOError", e)
+    except NotImplementedError as e:
+        pending = _unavailable(
+            "NotImplementedError: Make sure CELERY_RESULT_BACKEND is set", e
+        )
+    except BaseException as e:
+        pending = _unavailable("Unknown error", e)
+    else:
+        pending = None
+
+    for queue, _ in sent.values():
+        if queue not in probes:
+            probes[queue] = pending or _unavailable("Unknown error", None)
+
+    logger.info(
+        "Probe latencies: "
+        + ", ".join(f"{queue}={probe.latency}" for queue, probe in probes.items())
+    )
+    return probes
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Callable
+
+from celery import current_app as app
+from django.conf import settings
+
+from .depth import QueueDepth, QueueDepthMonitor, is_redis_broker
+from .probes import ProbeResult, probe_queues
+
+
+class SharedCall:
+    """
+    Result of a call shared by all the queue checks. The call is made at most
+    once per `ttl` seconds, concurrent callers wait for the one in flight
+    instead of making their own.
+    """
+
+    def __init__(self, fun: Callable, ttl: float):
+        self.fun = fun
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result = None
+        self._called_at: float | None = None
+
+    def __call__(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._called_at is None or now - self._called_at >= self.ttl:
+                self._result = self.fun()
+                self._called_at = time.monotonic()
+            return self._result
+
+    def invalidate(self):
+        with self._lock:
+            self._called_at = None
+
+
+def registered_queues() -> set[str]:
+    routes = settings.CELERY_TASK_ROUTES
+    if not routes:
+        return set()
+    return set([q for q in routes.values()])
+
+
+def inspect_active_queues() -> dict[str, list[dict]]:
+    """
+    Broadcasts a single active_queues inspection. When
+    HEALTHCHECK_CELERY_INSPECT_LIMIT is set, it returns as soon as that many
+    workers have replied, instead of waiting out the timeout. Without it,
+    all the workers are waited for, as a worker missed would have its queues
+    reported inactive.
+    """
+    inspect = app.control.inspect(
+        timeout=getattr(settings, "HEALTHCHECK_CELERY_INSPECT_TIMEOUT", 1.0),
+        limit=getattr(settings, "HEALTHCHECK_CELERY_INSPECT_LIMIT", None),
+    )
+    return inspect.active_queues() or {}
+
+
+active_queues = SharedCall(
+    inspect_active_queues,
+    ttl=getattr(settings, "HEALTHCHECK_CELERY_ACTIVE_QUEUES_TTL", 2),
+)
+
+
+def _probe_registered_queues() -> dict[str, ProbeResult]:
+    timeout = getattr(settings, "HEALTHCHECK_CELERY_TIMEOUT", 3)
+    return probe_queues(
+        registered_queues(),
+        result_timeout=getattr(settings, "HEALTHCHECK_CELERY_RESULT_TIMEOUT", timeout),
+        queue_timeout=getattr(settings, "HEALTHCHECK_CELERY_QUEUE_TIMEOUT", timeout),
+    )
+
+
+queue_probes = SharedCall(
+    _probe_registered_queues,
+    ttl=getattr(settings, "HEALTHCHECK_CELERY_PROBE_TTL", 2),
+)
+
+
+_depth_monitor: QueueDepthMonitor | None = None
+
+
+def _measure_registered_queues() -> dict[str, QueueDepth]:
+    global _depth_monitor
+
+    # Queue lengths can be read cheaply from a Redis broker only
+    if not is_redis_broker(settings.CELERY_BROKER_URL):
+        return {}
+    if _depth_monitor is None:
+        _depth_monitor = QueueDepthMonitor(
+            settings.CELERY_BROKER_URL,
+            trend_window=getattr(settings, "HEALTHCHECK_QUEUE_TREND_WINDOW", 60),
+        )
+    return _depth_monitor.measure(registered_queues())
+
+
+queue_depths = SharedCall(
+    _measure_registered_queues,
+    ttl=getattr(settings, "HEALTHCHECK_QUEUE_DEPTH_TTL", 2),
+)
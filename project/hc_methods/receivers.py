@@ -0,0 +1,42 @@
+from typing import Iterable
+
+from celery.events.receiver import EventReceiver
+from kombu import Queue, binding
+
+
+class FilteredEventReceiver(EventReceiver):
+    """
+    Event receiver consuming only the given event types. Its queue is bound
+    to the routing keys of those types alone, so the broker does not deliver
+    the rest, and whatever still arrives in a batch is dropped before it is
+    turned into an event.
+    """
+
+    def __init__(self, channel, event_types: Iterable[str], **kwargs):
+        super().__init__(channel, **kwargs)
+        self.event_types = frozenset(event_types)
+        self.queue = Queue(
+            self.queue.name,
+            bindings=[
+                # Events are published with the dashes of the type
+                # replaced by dots
+                binding(self.exchange, routing_key=event_type.replace("-", "."))
+                for event_type in sorted(self.event_types)
+            ],
+            auto_delete=self.queue.auto_delete,
+            durable=self.queue.durable,
+            message_ttl=self.queue.message_ttl,
+            expires=self.queue.expires,
+        )
+
+    def _receive(self, body, message, list=list, isinstance=isinstance):
+        if isinstance(body, list):
+            body = [event for event in body if event.get("type") in self.event_types]
+            if not body:
+                return
+        elif body.get("type") not in self.event_types:
+            return
+        super()._receive(body, message)
+
+
+__all__ = ["FilteredEventReceiver"]
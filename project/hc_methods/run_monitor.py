@@ -1,19 +1,79 @@
+import multiprocessing
 import os
+from typing import Iterable
+
 from celery import Celery
 from .monitors import EventsCamera
+from .receivers import FilteredEventReceiver
+from .state import HEALTH_EVENTS, HealthState
+
+#: Queue shared by the consumers of the sharded mode.
+SHARED_NODE_ID = "healthcheck_monitor"
+
 
+def main(
+    app,
+    freq=1.0,
+    event_types: Iterable[str] | None = HEALTH_EVENTS,
+    node_id: str | None = None,
+):
+    """
+    Captures events into the health storage. Only `event_types` are
+    received, all of them when None.
 
-def main(app, freq=1.0):
-    state = app.events.State()
+    Receivers with the same `node_id` share one queue, each of them gets
+    a part of the events.
+    """
+    state = HealthState()
 
     with app.connection() as connection:
-        recv = app.events.Receiver(connection, handlers={"*": state.event})
+        if event_types is None:
+            recv = app.events.Receiver(
+                connection, handlers={"*": state.event}, node_id=node_id
+            )
+        else:
+            recv = FilteredEventReceiver(
+                connection,
+                event_types=event_types,
+                handlers={event_type: state.event for event_type in event_types},
+                node_id=node_id,
+                app=app,
+            )
         with EventsCamera(state, freq=freq):
             recv.capture(limit=None, timeout=None)
 
 
-if __name__ == "__main__":
-    app = Celery(
+def make_app() -> Celery:
+    return Celery(
         "main", broker=os.getenv("CELERY_BROKER"), backend=os.getenv("CELERY_BACKEND")
     )
-    main(app)
+
+
+def _consume(freq: float):
+    # Every process needs its own app and broker connection
+    main(make_app(), freq=freq, node_id=SHARED_NODE_ID)
+
+
+def run_sharded(consumers: int, freq=1.0):
+    """
+    Runs `consumers` monitor processes sharing one event queue. Each of them
+    keeps the state of its part of the events and writes it to the health
+    storage, where the latest timestamp wins, so partial states merge
+    in any order.
+    """
+    processes = [
+        multiprocessing.Process(target=_consume, args=(freq,), name=f"monitor-{i}")
+        for i in range(consumers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    consumers = int(os.getenv("HEALTHCHECK_MONITOR_CONSUMERS", 1))
+    if consumers > 1:
+        run_sharded(consumers)
+    else:
+        main(make_app())
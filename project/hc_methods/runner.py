@@ -0,0 +1,87 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Iterable, NamedTuple
+
+from django.conf import settings
+from django.db import connections
+from health_check.backends import BaseHealthCheckBackend
+from health_check.exceptions import ServiceUnavailable
+from loguru import logger
+
+#: Seconds all the checks of a request have to finish in.
+DEADLINE = getattr(settings, "HEALTHCHECK_RUNNER_DEADLINE", 5)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "HEALTHCHECK_RUNNER_MAX_WORKERS", 8),
+    thread_name_prefix="healthcheck",
+)
+
+
+class Verdict(NamedTuple):
+    errors: list
+    time_taken: float
+    #: Monotonic time the check was evaluated at.
+    evaluated_at: float
+    #: Other results the check keeps on the instance, e.g. the queue latency.
+    details: dict = {}
+
+
+def evaluate(plugin: BaseHealthCheckBackend) -> Verdict:
+    """
+    Runs the check on a copy of the plugin, as checks keep their results
+    on the instance.
+    """
+    plugin = copy.copy(plugin)
+    try:
+        plugin.run_check()
+    finally:
+        # Checks run in threads of their own
+        connections.close_all()
+    details = {
+        name: value
+        for name, value in vars(plugin).items()
+        if name not in ("errors", "time_taken")
+    }
+    return Verdict(
+        errors=list(plugin.errors),
+        time_taken=plugin.time_taken,
+        evaluated_at=time.monotonic(),
+        details=details,
+    )
+
+
+def run_checks(
+    plugins: Iterable[BaseHealthCheckBackend],
+    evaluate: Callable[[BaseHealthCheckBackend], Verdict] = evaluate,
+    deadline: float = DEADLINE,
+):
+    """
+    Evaluates the checks concurrently on a bounded thread pool and puts the
+    results on the plugins. Checks still running when the deadline is over
+    are reported as timed out, the response does not wait for them, and
+    those not started yet are dropped from the pool. A check which fails
+    to evaluate is reported as unavailable on its own.
+    """
+    futures = [(plugin, _executor.submit(evaluate, plugin)) for plugin in plugins]
+    done, _ = wait([future for _, future in futures], timeout=deadline)
+
+    for plugin, future in futures:
+        if future in done:
+            try:
+                verdict = future.result()
+            except Exception as e:
+                logger.exception(f"{plugin.identifier()} has failed to evaluate")
+                plugin.errors = [ServiceUnavailable(f"The check has failed: {e!r}")]
+                plugin.time_taken = 0
+                continue
+            vars(plugin).update(verdict.details)
+            plugin.errors = list(verdict.errors)
+            plugin.time_taken = verdict.time_taken
+        else:
+            # Does nothing to the checks already running
+            future.cancel()
+            plugin.errors = [
+                ServiceUnavailable(f"The check did not finish in {deadline} seconds")
+            ]
+            plugin.time_taken = deadline
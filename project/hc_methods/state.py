@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from typing import NamedTuple
+
+from django.conf import settings
+
+#: Event types `HealthState` makes use of, task-received is the one bringing
+#: the task name.
+HEALTH_EVENTS = getattr(
+    settings,
+    "HEALTHCHECK_MONITOR_EVENTS",
+    (
+        "worker-online",
+        "worker-heartbeat",
+        "worker-offline",
+        "task-received",
+        "task-started",
+    ),
+)
+
+
+class WorkerLiveness(NamedTuple):
+    hostname: str
+    #: Local time the last worker event was received at.
+    last_heartbeat: float
+    processed: int
+    active: int
+    online: bool
+
+
+class TaskLastSeen(NamedTuple):
+    name: str
+    #: Local time the last event of a task with this name was received at.
+    last_seen: float
+    count: int
+
+
+class LRUCache(MutableMapping):
+    """
+    Mapping holding at most `maxsize` items, the least recently written
+    ones are evicted first, as well as the ones not written for `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def __getitem__(self, key):
+        return self._data[key][1]
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        return default if item is None else item[1]
+
+    def __setitem__(self, key, value):
+        now = time.monotonic()
+        self._data[key] = (now, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        self.expire(now)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
+    def clear(self):
+        self._data.clear()
+
+    def expire(self, now: float | None = None):
+        if self.ttl is None:
+            return
+        deadline = (now or time.monotonic()) - self.ttl
+        while self._data:
+            written_at, _ = next(iter(self._data.values()))
+            if written_at >= deadline:
+                break
+            self._data.popitem(last=False)
+
+
+class HealthState:
+    """
+    Replacement of `celery.events.State` keeping only what the health checks
+    need: the last heartbeat of every worker, the last time a task with
+    a given name was seen and event counters. All of them are held in
+    bounded structures, so memory stays flat no matter how long the monitor
+    runs.
+
+    `workers` and `tasks` are keyed by hostname and task name, their values
+    have `hostname` and `name` attributes like the ones of the Celery state,
+    so the snapshot cameras work with both.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = getattr(settings, "HEALTHCHECK_STATE_MAX_WORKERS", 1000),
+        max_tasks: int = getattr(settings, "HEALTHCHECK_STATE_MAX_TASKS", 10000),
+        ttl: float | None = settings.HEALTHCHECK_STORAGE_TTL,
+    ):
+        self._mutex = threading.Lock()
+        self.workers: LRUCache = LRUCache(max_workers, ttl)
+        self.tasks: LRUCache = LRUCache(max_tasks, ttl)
+        # Most task events carry only the uuid, the name comes with
+        # task-received
+        self._task_names: LRUCache = LRUCache(max_tasks * 10, ttl)
+        self.counters: Counter = Counter()
+        self.event_count = 0
+        self.task_count = 0
+
+    def event(self, event: dict):
+        with self._mutex:
+            self._event(event)
+
+    def _event(self, event: dict):
+        self.event_count += 1
+        event_type = event["type"]
+        self.counters[event_type] += 1
+        timestamp = event.get("local_received") or time.time()
+        group, _, subject = event_type.partition("-")
+
+        if group == "worker":
+            hostname = event["hostname"]
+            previous = self.workers.get(hostname)
+            self.workers[hostname] = WorkerLiveness(
+                hostname=hostname,
+                last_heartbeat=timestamp,
+                processed=event.get(
+                    "processed", previous.processed if previous else 0
+                ),
+                active=event.get("active", previous.active if previous else 0),
+                online=subject != "offline",
+            )
+        elif group == "task":
+            self.task_count += 1
+            name = event.get("name")
+            if name:
+                self._task_names[event["uuid"]] = name
+            else:
+                name = self._task_names.get(event["uuid"])
+            if name:
+                previous = self.tasks.get(name)
+                self.tasks[name] = TaskLastSeen(
+                    name=name,
+                    last_seen=timestamp,
+                    count=previous.count + 1 if previous else 1,
+                )
+
+    def task_name(self, uuid: str) -> str | None:
+        return self._task_names.get(uuid)
+
+    def freeze_while(self, fun, *args, **kwargs):
+        clear_after = kwargs.pop("clear_after", False)
+        with self._mutex:
+            try:
+                return fun(*args, **kwargs)
+            finally:
+                if clear_after:
+                    self._clear()
+
+    def clear(self):
+        with self._mutex:
+            self._clear()
+
+    def _clear(self):
+        # Task names are kept, the tasks they belong to may still be running
+        self.workers.clear()
+        self.tasks.clear()
+        self.counters.clear()
+        self.event_count = 0
+        self.task_count = 0
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}: {self.event_count} events, "
+            f"{len(self.workers)} workers, {len(self.tasks)} task names>"
+        )
+
+
+__all__ = ["HEALTH_EVENTS", "HealthState", "LRUCache", "TaskLastSeen", "WorkerLiveness"]
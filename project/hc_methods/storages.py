@@ -1,30 +1,82 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
 from enum import StrEnum
 
 from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable
 
 from django.utils import timezone
 from django.conf import settings
 from loguru import logger
-from redis import Redis
+from redis import ConnectionPool, Redis
+
+
+# Idle connections are PINGed before reuse once this many seconds have passed,
+# instead of PINGing on every call.
+HEALTH_CHECK_INTERVAL = getattr(
+    settings, "HEALTHCHECK_REDIS_HEALTH_CHECK_INTERVAL", 30
+)
+
+_connection_pools: dict[tuple[str, int], ConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db: int = 0, url: str | None = None) -> ConnectionPool:
+    """
+    Returns a connection pool for the given Redis url and database which is
+    shared by every handler in the process, so connections outlive a single
+    call.
+    """
+    url = url or settings.REDIS_URL
+    pool = _connection_pools.get((url, db))
+    if pool is None:
+        with _connection_pools_lock:
+            pool = _connection_pools.get((url, db))
+            if pool is None:
+                pool = ConnectionPool.from_url(
+                    f"{url}/{db}", health_check_interval=HEALTH_CHECK_INTERVAL
+                )
+                _connection_pools[(url, db)] = pool
+    return pool
 
 
 class RedisHandler:
     def __init__(self, db=0):
-        self.client = Redis.from_url(f"{settings.REDIS_URL}/{db}")
+        # Connections are taken from the pool per command and given back
+        # right after, so there is nothing to close here.
+        self.client = Redis(connection_pool=get_connection_pool(db))
 
     def __enter__(self):
-        if not self.client.ping():
-            raise ConnectionError("Can not ping Redis.")
         return self.client
 
     def __exit__(self, exc_type, exc_value, exc_traceback) -> bool:
-        self.client.close()
         return False  # Do not suppress exceptions
 
-    def __del__(self) -> None:
-        self.client.close()
+
+# Sets every key given its value is newer than the stored one, so writes
+# coming from several monitors in any order converge to the latest timestamp.
+# ARGV[1] is the TTL (0 for none), the values follow.
+SET_IF_NEWER = """
+local ttl = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local value = ARGV[i + 1]
+    local current = redis.call("GET", key)
+    if not current or current < value then
+        if ttl > 0 then
+            redis.call("SET", key, value, "EX", ttl)
+        else
+            redis.call("SET", key, value)
+        end
+    end
+end
+"""
 
 
 class HealthcheckStorage:
@@ -34,10 +86,28 @@ class HealthcheckStorage:
         self.ttl = ttl
         self.db = db
 
+    @staticmethod
+    def _format(timestamp: datetime) -> str:
+        # Fixed width UTC timestamps compare the same way as strings
+        # and as datetimes.
+        return timestamp.astimezone(dt_timezone.utc).isoformat(timespec="microseconds")
+
     def set(self, key: str):
-        timestamp = timezone.now().isoformat()
+        self.set_many({key: timezone.now()})
+
+    def set_many(self, timestamps: dict[str, datetime]):
+        """
+        Writes all the given timestamps in a single round trip. A stored
+        timestamp is only replaced by a newer one, so the write is idempotent.
+        """
+        if not timestamps:
+            return
         with RedisHandler(self.db) as self.client:
-            self.client.set(key, timestamp, ex=self.ttl)
+            set_if_newer = self.client.register_script(SET_IF_NEWER)
+            set_if_newer(
+                keys=list(timestamps),
+                args=[self.ttl or 0, *map(self._format, timestamps.values())],
+            )
 
     def get(self, key) -> datetime:
         with RedisHandler(self.db) as self.client:
@@ -45,6 +115,183 @@ class HealthcheckStorage:
             if value:
                 return datetime.fromisoformat(value.decode())
 
+    def get_many(self, keys: Iterable[str]) -> dict[str, datetime | None]:
+        """
+        Reads the timestamps of all the given keys with a single MGET.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        with RedisHandler(self.db) as self.client:
+            values = self.client.mget(keys)
+        return {
+            key: datetime.fromisoformat(value.decode()) if value else None
+            for key, value in zip(keys, values)
+        }
+
+    def prune(self):
+        # Records expire on their own
+        pass
+
+
+# Same as SET_IF_NEWER for the fields of a hash holding epoch milliseconds,
+# ARGV holds field and value pairs.
+HSET_IF_NEWER = """
+for i = 1, #ARGV, 2 do
+    local value = tonumber(ARGV[i + 1])
+    local current = tonumber(redis.call("HGET", KEYS[1], ARGV[i]))
+    if not current or current < value then
+        redis.call("HSET", KEYS[1], ARGV[i], value)
+    end
+end
+"""
+
+
+class HashHealthcheckStorage:
+    """
+    Compact layout of the health records: one hash per category, with
+    timestamps stored as epoch milliseconds. Fields do not expire on their
+    own, records older than `ttl` are treated as missing when read and
+    removed by `prune`. All the records of a category are read with a single
+    HGETALL.
+    """
+
+    client: Redis
+
+    class Category(StrEnum):
+        tasks = "tasks"
+        workers = "workers"
+        ready = "ready"
+
+    def __init__(self, category: Category, ttl: int = None, db: int = 5):
+        self.category = category
+        self.key = f"healthcheck:{category}"
+        self.ttl = ttl
+        self.db = db
+
+    @staticmethod
+    def _to_millis(timestamp: datetime) -> int:
+        return int(timestamp.timestamp() * 1000)
+
+    def _to_datetime(self, value: bytes | None) -> datetime | None:
+        if value is None:
+            return None
+        timestamp = datetime.fromtimestamp(int(value) / 1000, tz=dt_timezone.utc)
+        if self.ttl and timezone.now() - timestamp > timedelta(seconds=self.ttl):
+            return None
+        return timestamp
+
+    def set(self, key: str):
+        self.set_many({key: timezone.now()})
+
+    def set_many(self, timestamps: dict[str, datetime]):
+        """
+        Writes all the given timestamps in a single round trip, a stored
+        timestamp is only replaced by a newer one.
+        """
+        if not timestamps:
+            return
+        args = []
+        for key, timestamp in timestamps.items():
+            args += [key, self._to_millis(timestamp)]
+        with RedisHandler(self.db) as self.client:
+            hset_if_newer = self.client.register_script(HSET_IF_NEWER)
+            hset_if_newer(keys=[self.key], args=args)
+
+    def delete(self, key: str):
+        with RedisHandler(self.db) as self.client:
+            self.client.hdel(self.key, key)
+
+    def get(self, key: str) -> datetime | None:
+        with RedisHandler(self.db) as self.client:
+            return self._to_datetime(self.client.hget(self.key, key))
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, datetime | None]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        with RedisHandler(self.db) as self.client:
+            values = self.client.hmget(self.key, keys)
+        return {key: self._to_datetime(value) for key, value in zip(keys, values)}
+
+    def get_all(self) -> dict[str, datetime]:
+        with RedisHandler(self.db) as self.client:
+            values = self.client.hgetall(self.key)
+        records = {
+            key.decode(): self._to_datetime(value) for key, value in values.items()
+        }
+        return {key: value for key, value in records.items() if value}
+
+    def prune(self):
+        """
+        Removes the records which have gone stale.
+        """
+        if not self.ttl:
+            return
+        with RedisHandler(self.db) as self.client:
+            values = self.client.hgetall(self.key)
+            stale = [
+                key for key, value in values.items() if not self._to_datetime(value)
+            ]
+            if stale:
+                self.client.hdel(self.key, *stale)
+
+
+def get_healthcheck_storage(category: HashHealthcheckStorage.Category, ttl=None):
+    """
+    Returns the storage of the health records of the given category,
+    in the layout selected by the HEALTHCHECK_STORAGE_LAYOUT setting:
+    "keys" (a key per record, shared by all categories) or "hash".
+    """
+    if getattr(settings, "HEALTHCHECK_STORAGE_LAYOUT", "keys") == "hash":
+        return HashHealthcheckStorage(category=category, ttl=ttl)
+    return HealthcheckStorage(ttl=ttl)
+
+
+class WriteBehindBuffer:
+    """
+    Collects the latest timestamp of every key between flushes, and writes
+    only the keys whose stored value would move by more than `resolution`.
+    Hot keys, seen thousands of times a minute, are then written at most
+    once per `resolution`.
+    """
+
+    def __init__(
+        self, storage: HealthcheckStorage | HashHealthcheckStorage, resolution: float
+    ):
+        self.storage = storage
+        self.resolution = timedelta(seconds=resolution)
+        self._dirty: dict[str, datetime] = {}
+        # Last values written by this buffer
+        self._flushed: dict[str, datetime] = {}
+
+    def update(self, key: str, timestamp: datetime):
+        current = self._dirty.get(key)
+        if current is None or current < timestamp:
+            self._dirty[key] = timestamp
+
+    def flush(self):
+        changed = {
+            key: timestamp
+            for key, timestamp in self._dirty.items()
+            if key not in self._flushed
+            or timestamp - self._flushed[key] > self.resolution
+        }
+        self._dirty.clear()
+
+        self.storage.set_many(changed)
+        self._flushed.update(changed)
+
+        # Keys expired from the storage have to be written again
+        if self.storage.ttl:
+            deadline = timezone.now() - timedelta(seconds=self.storage.ttl)
+            self._flushed = {
+                key: timestamp
+                for key, timestamp in self._flushed.items()
+                if timestamp > deadline
+            }
+        return changed
+
 
 class HealthRecordNotFound(Exception):
     ...
@@ -57,9 +304,14 @@ class HealthCheckFiles:
         alive = "alive"
         ready = "ready"
 
+    # Folders already created by this process
+    _folders: set[Path] = set()
+
     def __init__(self, category: Category | None):
         self.folder = self.TEMPDIR / category if category else self.TEMPDIR
-        self.folder.mkdir(parents=True, exist_ok=True)
+        if self.folder not in self._folders:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            self._folders.add(self.folder)
 
     def get(self, key: str) -> datetime:
         file = self.folder / key
@@ -81,4 +333,165 @@ class HealthCheckFiles:
         file.unlink(missing_ok=True)
 
     def get_keys(self) -> list[str]:
-        return [item.stem for item in self.folder.glob("*")]
+        return list(self.scan())
+
+    def scan(self) -> dict[str, datetime]:
+        """
+        Returns the modification time of every record in a single directory
+        pass, `DirEntry` caches the stat result.
+        """
+        tz = timezone.get_current_timezone()
+        try:
+            with os.scandir(self.folder) as entries:
+                return {
+                    entry.name: datetime.fromtimestamp(entry.stat().st_mtime, tz=tz)
+                    for entry in entries
+                    if entry.is_file()
+                }
+        except FileNotFoundError:
+            return {}
+
+
+class HeartbeatTable:
+    """
+    Heartbeat storage backed by a fixed-layout memory-mapped file shared by
+    all the processes on the host. Every slot holds a hostname and the
+    monotonic time of its last heartbeat, so a heartbeat is a single write
+    into the mapping and reading all of them is one sequential scan, without
+    any filesystem metadata calls.
+
+    Slots are found by open addressing on the hostname hash. Deleted slots
+    keep their hostname with a zero timestamp so the probe chains stay
+    intact, and are reused by the next claimed hostname.
+    """
+
+    PATH = HealthCheckFiles.TEMPDIR / "heartbeats.tbl"
+    SLOT = struct.Struct("120sd")
+    NAME_SIZE = 120
+    TIMESTAMP = struct.Struct("d")
+
+    def __init__(self, slots: int = 1024, path: Path | None = None):
+        self.slots = slots
+        self.path = path or self.PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        size = slots * self.SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        # Slots of the hostnames written by this process
+        self._own_slots: dict[str, int] = {}
+
+    def _encode(self, key: str) -> bytes:
+        name = key.encode()
+        if len(name) > self.NAME_SIZE:
+            raise ValueError(f"Hostname {key} is too long for the heartbeat table")
+        return name.ljust(self.NAME_SIZE, b"\0")
+
+    def _read_slot(self, index: int) -> tuple[bytes, float]:
+        return self.SLOT.unpack_from(self._map, index * self.SLOT.size)
+
+    def _write_timestamp(self, index: int, timestamp: float):
+        offset = index * self.SLOT.size + self.NAME_SIZE
+        self.TIMESTAMP.pack_into(self._map, offset, timestamp)
+
+    def _find(self, name: bytes) -> tuple[int | None, int | None]:
+        """
+        Walks the probe chain of the name. Returns its slot if it is claimed
+        and the first free slot on the way otherwise.
+        """
+        start = zlib.crc32(name) % self.slots
+        free = None
+        for step in range(self.slots):
+            index = (start + step) % self.slots
+            slot_name, timestamp = self._read_slot(index)
+            if slot_name == name:
+                return index, None
+            if not slot_name.strip(b"\0"):
+                return None, index if free is None else free
+            if not timestamp and free is None:
+                free = index
+        return None, free
+
+    def _claim(self, name: bytes) -> int:
+        with open(self.path, "rb") as lock:
+            # Claims are rare, readers and heartbeat writes do not lock
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            index, free = self._find(name)
+            if index is not None:
+                return index
+            if free is None:
+                raise OverflowError("The heartbeat table is full")
+            self._write_timestamp(free, 0.0)
+            offset = free * self.SLOT.size
+            self._map[offset : offset + self.NAME_SIZE] = name
+            return free
+
+    def set(self, key: str):
+        name = self._encode(key)
+        index = self._own_slots.get(key)
+        if index is None or self._read_slot(index)[0] != name:
+            index = self._own_slots[key] = self._claim(name)
+        self._write_timestamp(index, time.monotonic())
+
+    def delete(self, key: str):
+        index, _ = self._find(self._encode(key))
+        if index is not None:
+            self._write_timestamp(index, 0.0)
+
+    def get(self, key: str) -> datetime:
+        index, _ = self._find(self._encode(key))
+        if index is None:
+            raise HealthRecordNotFound(key)
+        _, timestamp = self._read_slot(index)
+        if not timestamp:
+            raise HealthRecordNotFound(key)
+        return self._to_datetime(timestamp)
+
+    def scan(self) -> dict[str, datetime]:
+        """
+        Returns the time of the last heartbeat of every live hostname.
+        """
+        heartbeats = {}
+        for name, timestamp in self.SLOT.iter_unpack(self._map):
+            if timestamp:
+                heartbeats[name.rstrip(b"\0").decode()] = self._to_datetime(timestamp)
+        return heartbeats
+
+    def get_keys(self) -> list[str]:
+        return list(self.scan())
+
+    @staticmethod
+    def _to_datetime(timestamp: float) -> datetime:
+        # Monotonic clock is shared by the processes of the host
+        # and is not affected by wall clock adjustments.
+        return timezone.now() - timedelta(seconds=time.monotonic() - timestamp)
+
+
+_heartbeat_table: HeartbeatTable | None = None
+
+
+def get_heartbeat_storage():
+    """
+    Returns the storage for worker heartbeats selected by the
+    HEALTHCHECK_HEARTBEAT_BACKEND setting, one of "files", "mmap" or "events".
+    """
+    global _heartbeat_table
+
+    backend = getattr(settings, "HEALTHCHECK_HEARTBEAT_BACKEND", "files")
+    if backend == "events":
+        from .monitors import get_realtime_monitor
+
+        return get_realtime_monitor()
+    if backend == "mmap":
+        if _heartbeat_table is None:
+            _heartbeat_table = HeartbeatTable(
+                slots=getattr(settings, "HEALTHCHECK_HEARTBEAT_SLOTS", 1024)
+            )
+        return _heartbeat_table
+    return HealthCheckFiles(category=HealthCheckFiles.Category.alive)
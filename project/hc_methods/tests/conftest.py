@@ -0,0 +1,67 @@
+import fakeredis
+import pytest
+from redis import ConnectionPool, Redis
+
+from hc_methods import storages
+
+
+class CountingConnection(fakeredis.FakeConnection):
+    #: Requests sent to the server, a pipeline is sent as one.
+    round_trips = 0
+
+    def send_packed_command(self, command, check_health=True):
+        CountingConnection.round_trips += 1
+        return super().send_packed_command(command, check_health)
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """
+    In-memory Redis behind every pool `hc_methods.storages` hands out.
+    """
+    server = fakeredis.FakeServer()
+    pools = {}
+
+    def get_connection_pool(db=0, url=None):
+        if db not in pools:
+            pools[db] = ConnectionPool(
+                connection_class=CountingConnection, server=server, db=db
+            )
+        return pools[db]
+
+    monkeypatch.setattr(storages, "get_connection_pool", get_connection_pool)
+    return server
+
+
+@pytest.fixture
+def round_trips(redis_server):
+    """
+    Counts the requests sent to Redis since the last reset.
+    """
+
+    class Counter:
+        @property
+        def count(self):
+            return CountingConnection.round_trips
+
+        def reset(self):
+            CountingConnection.round_trips = 0
+
+    counter = Counter()
+    counter.reset()
+    return counter
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    return Redis(connection_pool=storages.get_connection_pool(db=5))
+
+
+@pytest.fixture
+def tempdir(tmp_path, monkeypatch):
+    """
+    Keeps the files of the health records out of the project folder.
+    """
+    monkeypatch.setattr(storages.HealthCheckFiles, "TEMPDIR", tmp_path)
+    monkeypatch.setattr(storages.HealthCheckFiles, "_folders", set())
+    return tmp_path
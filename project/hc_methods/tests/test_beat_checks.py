@@ -0,0 +1,121 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from celery import current_app
+from django.utils import timezone
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+from django_celery_beat.schedulers import ModelEntry
+
+from hc_methods.beat_task_intervals_check import backends
+from hc_methods.beat_task_intervals_check.backends import (
+    BeatTasksHealthCheck,
+    LazyBeatTasksHealthCheck,
+    get_sync_interval,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def schedulers(monkeypatch):
+    """
+    Counts the beat schedulers built, instead of building real ones.
+    """
+    built = []
+
+    def Service(app):
+        built.append(app)
+        scheduler = SimpleNamespace(sync_every=180)
+        return SimpleNamespace(get_scheduler=lambda: scheduler)
+
+    monkeypatch.setattr(backends, "Service", Service)
+    get_sync_interval.cache_clear()
+    yield built
+    get_sync_interval.cache_clear()
+
+
+def create_tasks(count, every=60, last_run_at=None):
+    interval, _ = IntervalSchedule.objects.get_or_create(
+        every=every, period=IntervalSchedule.SECONDS
+    )
+    first = PeriodicTask.objects.count()
+    return [
+        PeriodicTask.objects.create(
+            name=f"task-{i}",
+            task=f"tasks.task_{i}",
+            interval=interval,
+            last_run_at=last_run_at or timezone.now(),
+        )
+        for i in range(first, first + count)
+    ]
+
+
+def test_sync_interval_is_computed_once(schedulers):
+    create_tasks(20)
+
+    for _ in range(3):
+        LazyBeatTasksHealthCheck().run_check()
+
+    assert len(schedulers) == 1
+    assert get_sync_interval() == timedelta(seconds=180)
+
+
+def test_sync_interval_follows_settings(schedulers, settings):
+    get_sync_interval()
+    settings.CELERYBEAT_SYNC_EVERY = 1
+
+    assert get_sync_interval() == timedelta()
+
+
+@pytest.mark.parametrize(
+    "check_class", [LazyBeatTasksHealthCheck, BeatTasksHealthCheck]
+)
+def test_query_count_does_not_grow_with_tasks(check_class, redis_server):
+    create_tasks(5)
+    small = check_class()
+    small.run_check()
+
+    create_tasks(50)
+    large = check_class()
+    large.run_check()
+
+    assert large.query_count == small.query_count
+
+
+def test_lazy_check_does_not_need_redis_for_intervals(round_trips):
+    create_tasks(10)
+
+    check = LazyBeatTasksHealthCheck()
+    check.run_check()
+
+    assert check.errors == []
+    assert round_trips.count == 0
+
+
+def test_realtime_check_reads_redis_once(round_trips):
+    create_tasks(10)
+
+    check = BeatTasksHealthCheck()
+    check.run_check()
+
+    assert round_trips.count <= 2  # Connecting included
+
+
+def test_lazy_check_sees_the_runs_saved_by_beat(settings):
+    # Beat syncs every run
+    settings.CELERYBEAT_SYNC_EVERY = 1
+    (periodic_task,) = create_tasks(
+        1, every=5, last_run_at=timezone.now() - timedelta(seconds=60)
+    )
+    check = LazyBeatTasksHealthCheck()
+    check.run_check()
+    assert check.errors
+
+    # Beat saves the run without moving the PeriodicTasks change marker
+    entry = next(ModelEntry(periodic_task, app=current_app))
+    entry.save()
+
+    check = LazyBeatTasksHealthCheck()
+    check.run_check()
+    assert check.errors == []
@@ -0,0 +1,159 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.conf import settings
+
+from hc_methods import monitors
+from hc_methods.state import HealthState
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Timer:
+    """
+    Worker timer firing the heartbeats by hand.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def call_repeatedly(self, interval, fun, args, priority=0):
+        self.calls.append((interval, fun, args))
+        return SimpleNamespace(cancel=lambda: None)
+
+
+class CountingStorage:
+    def __init__(self, clock):
+        self.clock = clock
+        self.writes = []
+
+    def set(self, key):
+        self.writes.append(self.clock.now)
+
+    def delete(self, key):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(monitors, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def probe(clock, monkeypatch):
+    storage = CountingStorage(clock)
+    monkeypatch.setattr(monitors, "get_heartbeat_storage", lambda: storage)
+    worker = SimpleNamespace(hostname="celery@test", timer=Timer())
+    probe = monitors.LivenessProbe(worker)
+    probe.start(worker)
+    return probe, worker, storage
+
+
+def run_for(clock, worker, seconds, every):
+    interval, fun, args = worker.timer.calls[0]
+    deadline = clock.now + seconds
+    while clock.now + every <= deadline:
+        clock.now += every
+        fun(*args)
+
+
+def writes_per_minute(storage, minutes):
+    # The write made on start aside
+    return (len(storage.writes) - 1) / minutes
+
+
+def test_heartbeat_writes_per_minute(probe, clock):
+    probe, worker, storage = probe
+
+    run_for(clock, worker, 600, every=probe.interval)
+
+    # The probe used to write every second, 60 times a minute
+    assert writes_per_minute(storage, 10) <= 60 / 9
+
+
+def test_heartbeats_keep_up_with_the_timeout(probe, clock):
+    probe, worker, storage = probe
+
+    run_for(clock, worker, 600, every=probe.interval)
+
+    gaps = [b - a for a, b in zip(storage.writes, storage.writes[1:])]
+    # A live worker is refreshed several times within the timeout
+    assert max(gaps) < settings.HEALTHCHECK_WORKER_TIMEOUT / 2
+
+
+def test_bunched_timer_calls_are_coalesced(probe, clock):
+    probe, worker, storage = probe
+
+    # The timer catching up after the worker was blocked
+    run_for(clock, worker, 600, every=0.5)
+
+    assert writes_per_minute(storage, 10) <= 60 / (probe.interval / 2)
+
+
+def test_interval_from_settings(clock, monkeypatch, settings):
+    monkeypatch.setattr(monitors, "get_heartbeat_storage", lambda: None)
+    settings.HEALTHCHECK_WORKER_HEARTBEAT_INTERVAL = 5
+
+    probe = monitors.LivenessProbe(SimpleNamespace())
+
+    assert 5 * (1 - probe.jitter) <= probe.interval <= 5
+
+
+def snapshot(tasks, at, workers=10):
+    health_state = HealthState(max_workers=workers, max_tasks=tasks)
+    for i in range(workers):
+        health_state.event(
+            {
+                "type": "worker-heartbeat",
+                "hostname": f"celery@{i}",
+                "local_received": at,
+            }
+        )
+    for i in range(tasks):
+        health_state.event(
+            {
+                "type": "task-received",
+                "uuid": f"uuid-{i}",
+                "name": f"task-{i}",
+                "local_received": at,
+            }
+        )
+    return health_state
+
+
+@pytest.mark.parametrize("tasks", [10, 1_000, 50_000])
+def test_snapshot_round_trips_do_not_grow_with_tasks(tasks, round_trips):
+    now = time.time()
+    camera = monitors.EventsCamera(HealthState())
+    # Connects and loads the script
+    camera.on_shutter(snapshot(tasks, at=now))
+
+    round_trips.reset()
+    camera.on_shutter(snapshot(tasks, at=now + 10))
+
+    # The workers and the tasks are written in one batch
+    assert round_trips.count == 1
+    assert camera.tasks_buffer.storage.get("task-0") is not None
+
+
+def test_snapshot_round_trips_with_hash_layout(round_trips, settings):
+    settings.HEALTHCHECK_STORAGE_LAYOUT = "hash"
+    now = time.time()
+    camera = monitors.EventsCamera(HealthState())
+    camera.on_shutter(snapshot(100, at=now))
+
+    round_trips.reset()
+    camera.on_shutter(snapshot(100, at=now + 10))
+
+    # A hash per category, each written in one batch
+    assert round_trips.count == 2
+    assert camera.tasks_buffer.storage.get("task-0") is not None
@@ -0,0 +1,109 @@
+import time
+from datetime import timedelta
+
+import pytest
+from celery import Celery
+from django.utils import timezone
+
+from hc_methods.receivers import FilteredEventReceiver
+from hc_methods.state import HEALTH_EVENTS
+from hc_methods.storages import HealthcheckStorage
+
+
+@pytest.fixture
+def app():
+    app = Celery("test", broker="memory://", set_as_current=False)
+    yield app
+    app.close()
+
+
+def synthetic_events(count):
+    """
+    Mix of events as a busy cluster sends them, one in five of the types
+    the health checks use.
+    """
+    for i in range(count):
+        if i % 5 == 0:
+            yield "worker-heartbeat", {"active": i}
+        else:
+            yield "task-succeeded", {"uuid": f"uuid-{i}", "result": "42"}
+
+
+def receiver(app, connection, received, node_id="test"):
+    recv = FilteredEventReceiver(
+        connection,
+        event_types=HEALTH_EVENTS,
+        handlers={"*": received.append},
+        node_id=node_id,
+        app=app,
+    )
+    # Bound before anything is sent
+    recv.queue(connection.default_channel).declare()
+    return recv
+
+
+def send(app, connection, count):
+    with app.events.Dispatcher(connection, hostname="celery@test") as dispatcher:
+        for event_type, fields in synthetic_events(count):
+            dispatcher.send(event_type, **fields)
+
+
+def test_receiver_gets_only_health_events(app):
+    received = []
+    with app.connection() as connection:
+        recv = receiver(app, connection, received)
+        send(app, connection, 1000)
+
+        recv.capture(limit=200, timeout=2, wakeup=False)
+        # Nothing else is left in the queue
+        with pytest.raises(TimeoutError):
+            recv.capture(limit=1, timeout=0.2, wakeup=False)
+
+    assert len(received) == 200
+    assert {event["type"] for event in received} == {"worker-heartbeat"}
+
+
+def test_receiver_throughput(app, record_property):
+    received = []
+    with app.connection() as connection:
+        recv = receiver(app, connection, received)
+        send(app, connection, 10_000)
+
+        started_at = time.perf_counter()
+        recv.capture(limit=2000, timeout=5, wakeup=False)
+        elapsed = time.perf_counter() - started_at
+
+    events_per_second = len(received) / elapsed
+    record_property("health_events_per_second", round(events_per_second))
+    assert len(received) == 2000
+    assert events_per_second > 500
+
+
+def test_shards_split_the_events(app):
+    first, second = [], []
+    with app.connection() as connection:
+        first_recv = receiver(app, connection, first, node_id="shared")
+        second_recv = receiver(app, connection, second, node_id="shared")
+        send(app, connection, 1000)
+
+        first_recv.capture(limit=120, timeout=2, wakeup=False)
+        second_recv.capture(limit=80, timeout=2, wakeup=False)
+
+    # One queue for both, every event is received exactly once
+    assert first_recv.queue.name == second_recv.queue.name
+    assert len(first) + len(second) == 200
+    assert len({event["active"] for event in first + second}) == 200
+
+
+def test_partial_states_merge_in_any_order(redis_server):
+    storage = HealthcheckStorage(ttl=60)
+    now = timezone.now()
+
+    # Shards flushing the same worker out of order
+    storage.set_many({"celery@a": now, "celery@b": now - timedelta(seconds=5)})
+    storage.set_many({"celery@a": now - timedelta(seconds=5), "celery@b": now})
+
+    assert storage.get_many(["celery@a", "celery@b"]) == {
+        "celery@a": now,
+        "celery@b": now,
+    }
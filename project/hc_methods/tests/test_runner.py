@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from health_check.backends import BaseHealthCheckBackend
+
+from hc_methods import runner
+from hc_methods.runner import run_checks
+
+
+class SleepingCheck(BaseHealthCheckBackend):
+    def __init__(self, seconds, started=None):
+        super().__init__()
+        self.seconds = seconds
+        self.started = started
+
+    def check_status(self):
+        if self.started is not None:
+            self.started.append(self)
+        time.sleep(self.seconds)
+
+
+class BrokenCheck(BaseHealthCheckBackend):
+    def run_check(self):
+        raise RuntimeError("broken")
+
+
+def test_latency_tracks_the_slowest_check():
+    checks = [SleepingCheck(0.2) for _ in range(5)]
+
+    started_at = time.monotonic()
+    run_checks(checks, deadline=5)
+    elapsed = time.monotonic() - started_at
+
+    # Not the sum of them, a second
+    assert elapsed < 0.5
+    assert all(check.errors == [] for check in checks)
+
+
+def test_broken_check_is_reported_on_its_own():
+    working, broken = SleepingCheck(0), BrokenCheck()
+
+    run_checks([working, broken], deadline=5)
+
+    assert working.errors == []
+    assert "broken" in str(broken.errors[0])
+
+
+def test_overdue_checks_time_out_and_leave_the_pool(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(runner, "_executor", executor)
+    started = []
+    checks = [SleepingCheck(0.3, started) for _ in range(3)]
+
+    run_checks(checks, deadline=0.1)
+    executor.shutdown(wait=True)
+
+    assert all("did not finish" in str(check.errors[0]) for check in checks)
+    # The queued checks were cancelled instead of running after the response
+    assert len(started) == 1
@@ -0,0 +1,102 @@
+import pytest
+
+from hc_methods import state
+from hc_methods.state import HealthState, LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(state, "time", clock)
+    return clock
+
+
+def task_events(count, names=10):
+    for i in range(count):
+        uuid = f"uuid-{i}"
+        yield {"type": "task-received", "uuid": uuid, "name": f"task-{i % names}"}
+        yield {"type": "task-started", "uuid": uuid}
+
+
+def test_lru_cache_evicts_least_recently_written(clock):
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3
+    cache["c"] = 4
+
+    assert dict(cache) == {"a": 3, "c": 4}
+
+
+def test_lru_cache_expires_items(clock):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache["old"] = 1
+    clock.now += 61
+    cache["new"] = 2
+
+    assert dict(cache) == {"new": 2}
+
+
+def test_state_tracks_workers(clock):
+    health_state = HealthState()
+
+    health_state.event({"type": "worker-online", "hostname": "celery@a"})
+    clock.now += 5
+    health_state.event(
+        {"type": "worker-heartbeat", "hostname": "celery@a", "processed": 7}
+    )
+    health_state.event({"type": "worker-offline", "hostname": "celery@b"})
+
+    worker = health_state.workers["celery@a"]
+    assert worker.last_heartbeat == clock.now
+    assert worker.processed == 7
+    assert worker.online
+    assert not health_state.workers["celery@b"].online
+
+
+def test_state_names_tasks_by_uuid(clock):
+    health_state = HealthState()
+
+    for event in task_events(3, names=2):
+        health_state.event(event)
+
+    assert health_state.task_name("uuid-2") == "task-0"
+    assert health_state.tasks["task-0"].count == 4
+    assert health_state.tasks["task-1"].count == 2
+    assert health_state.counters["task-started"] == 3
+
+
+def test_state_stays_bounded(clock):
+    health_state = HealthState(max_workers=10, max_tasks=100)
+
+    for event in task_events(100_000, names=1000):
+        health_state.event(event)
+    for i in range(1000):
+        health_state.event({"type": "worker-heartbeat", "hostname": f"celery@{i}"})
+
+    assert len(health_state.tasks) == 100
+    assert len(health_state._task_names) == 1000
+    assert len(health_state.workers) == 10
+    assert health_state.event_count == 201_000
+
+
+def test_state_clear_keeps_task_names(clock):
+    health_state = HealthState()
+    health_state.event({"type": "task-received", "uuid": "u", "name": "task"})
+
+    health_state.freeze_while(lambda: None, clear_after=True)
+    health_state.event({"type": "task-succeeded", "uuid": "u"})
+
+    assert health_state.event_count == 1
+    assert health_state.tasks["task"].count == 1
@@ -0,0 +1,217 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from hc_methods import storages
+from hc_methods.storages import (
+    HashHealthcheckStorage,
+    HealthCheckFiles,
+    HealthcheckStorage,
+    HealthRecordNotFound,
+    HeartbeatTable,
+    WriteBehindBuffer,
+    get_healthcheck_storage,
+)
+
+
+class RecordingStorage:
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.batches = []
+
+    def set_many(self, timestamps):
+        self.batches.append(dict(timestamps))
+
+
+def test_buffer_keeps_the_latest_timestamp():
+    storage = RecordingStorage()
+    buffer = WriteBehindBuffer(storage, resolution=1)
+    now = timezone.now()
+
+    buffer.update("worker", now)
+    buffer.update("worker", now - timedelta(seconds=5))
+    buffer.update("worker", now + timedelta(seconds=5))
+
+    assert buffer.flush() == {"worker": now + timedelta(seconds=5)}
+    assert storage.batches == [{"worker": now + timedelta(seconds=5)}]
+
+
+def test_buffer_skips_moves_within_resolution():
+    storage = RecordingStorage()
+    buffer = WriteBehindBuffer(storage, resolution=10)
+    now = timezone.now()
+
+    buffer.update("hot", now)
+    buffer.flush()
+    # Thousands of events of the same key between two snapshots
+    for second in range(1000):
+        buffer.update("hot", now + timedelta(milliseconds=second))
+    assert buffer.flush() == {}
+
+    buffer.update("hot", now + timedelta(seconds=11))
+    assert buffer.flush() == {"hot": now + timedelta(seconds=11)}
+
+
+def test_buffer_writes_all_changed_keys_in_one_batch():
+    storage = RecordingStorage()
+    buffer = WriteBehindBuffer(storage, resolution=1)
+    now = timezone.now()
+
+    for i in range(1000):
+        buffer.update(f"task-{i}", now)
+    buffer.flush()
+
+    assert len(storage.batches) == 1
+    assert len(storage.batches[0]) == 1000
+
+
+def test_buffer_rewrites_keys_expired_from_storage():
+    storage = RecordingStorage(ttl=60)
+    buffer = WriteBehindBuffer(storage, resolution=3600)
+    long_ago = timezone.now() - timedelta(seconds=120)
+
+    buffer.update("worker", long_ago)
+    buffer.flush()
+    buffer.update("worker", long_ago + timedelta(seconds=1))
+
+    assert buffer.flush() == {"worker": long_ago + timedelta(seconds=1)}
+
+
+def test_buffer_flushes_into_redis(redis_server):
+    storage = HealthcheckStorage(ttl=60)
+    buffer = WriteBehindBuffer(storage, resolution=1)
+    now = timezone.now()
+
+    buffer.update("worker", now)
+    buffer.flush()
+
+    assert storage.get_many(["worker", "missing"]) == {"worker": now, "missing": None}
+
+
+@pytest.fixture
+def heartbeats(tmp_path):
+    return HeartbeatTable(slots=16, path=tmp_path / "heartbeats.tbl")
+
+
+def test_heartbeat_table_set_get_delete(heartbeats):
+    heartbeats.set("celery@first")
+
+    assert timezone.now() - heartbeats.get("celery@first") < timedelta(seconds=1)
+
+    heartbeats.delete("celery@first")
+    with pytest.raises(HealthRecordNotFound):
+        heartbeats.get("celery@first")
+    assert heartbeats.scan() == {}
+
+
+def test_heartbeat_table_is_shared_by_processes(heartbeats, tmp_path):
+    # Another process maps the same file
+    other = HeartbeatTable(slots=16, path=tmp_path / "heartbeats.tbl")
+
+    heartbeats.set("celery@first")
+    other.set("celery@second")
+
+    assert set(heartbeats.scan()) == set(other.scan()) == {
+        "celery@first",
+        "celery@second",
+    }
+
+
+def test_heartbeat_table_reuses_deleted_slots(heartbeats):
+    for i in range(16):
+        heartbeats.set(f"celery@{i}")
+    with pytest.raises(OverflowError):
+        heartbeats.set("celery@extra")
+
+    heartbeats.delete("celery@3")
+    heartbeats.set("celery@extra")
+
+    assert "celery@extra" in heartbeats.scan()
+    assert "celery@3" not in heartbeats.scan()
+    # The probe chains survive the reuse
+    for i in set(range(16)) - {3}:
+        heartbeats.get(f"celery@{i}")
+
+
+def test_heartbeat_table_rejects_long_hostnames(heartbeats):
+    with pytest.raises(ValueError):
+        heartbeats.set("celery@" + "x" * HeartbeatTable.NAME_SIZE)
+
+
+def test_heartbeat_table_matches_files_at_500_workers(tempdir):
+    hostnames = [f"celery@worker-{i}" for i in range(500)]
+    table = HeartbeatTable(slots=1024, path=tempdir / "heartbeats.tbl")
+    files = HealthCheckFiles(category=HealthCheckFiles.Category.alive)
+
+    for hostname in hostnames:
+        table.set(hostname)
+        files.set(hostname)
+
+    assert set(table.scan()) == set(files.scan()) == set(hostnames)
+
+
+def test_connection_pool_is_shared(monkeypatch):
+    monkeypatch.setattr(storages, "_connection_pools", {})
+
+    pool = storages.get_connection_pool(db=5, url="redis://localhost:6379")
+
+    assert storages.get_connection_pool(db=5, url="redis://localhost:6379") is pool
+    assert storages.get_connection_pool(db=6, url="redis://localhost:6379") is not pool
+
+
+def test_storage_calls_take_one_round_trip(round_trips):
+    storage = HealthcheckStorage(ttl=60)
+    storage.set("warm-up")
+
+    round_trips.reset()
+    storage.set("worker")
+    storage.get("worker")
+    storage.get_many(["worker", "other"])
+
+    # No PING before every call, no reconnecting
+    assert round_trips.count == 3
+
+
+def test_hash_storage_keeps_the_newest_timestamp(redis_server):
+    storage = HashHealthcheckStorage(HashHealthcheckStorage.Category.tasks, ttl=60)
+    now = timezone.now().replace(microsecond=0)
+
+    storage.set_many({"task": now})
+    storage.set_many({"task": now - timedelta(seconds=10)})
+
+    assert storage.get("task") == now
+    assert storage.get_many(["task", "missing"]) == {"task": now, "missing": None}
+
+
+def test_hash_storage_reads_all_records_at_once(round_trips):
+    storage = HashHealthcheckStorage(HashHealthcheckStorage.Category.tasks)
+    now = timezone.now()
+    storage.set_many({f"task-{i}": now for i in range(100_000)})
+
+    round_trips.reset()
+    records = storage.get_all()
+
+    assert len(records) == 100_000
+    assert round_trips.count == 1
+
+
+def test_hash_storage_drops_stale_records(redis_client):
+    storage = HashHealthcheckStorage(HashHealthcheckStorage.Category.workers, ttl=60)
+    now = timezone.now()
+    storage.set_many({"fresh": now, "stale": now - timedelta(seconds=120)})
+
+    assert set(storage.get_all()) == {"fresh"}
+
+    storage.prune()
+    assert redis_client.hkeys("healthcheck:workers") == [b"fresh"]
+
+
+def test_storage_layout_from_settings(settings):
+    settings.HEALTHCHECK_STORAGE_LAYOUT = "hash"
+    storage = get_healthcheck_storage(HashHealthcheckStorage.Category.ready)
+    assert storage.key == "healthcheck:ready"
+
+    settings.HEALTHCHECK_STORAGE_LAYOUT = "keys"
+    storage = get_healthcheck_storage(HashHealthcheckStorage.Category.ready)
+    assert isinstance(storage, HealthcheckStorage)
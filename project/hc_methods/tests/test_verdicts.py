@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.conf import settings
+from health_check.backends import BaseHealthCheckBackend
+
+from hc_methods import verdicts
+from hc_methods.verdicts import VerdictCache
+
+
+class GatedCheck(BaseHealthCheckBackend):
+    """
+    Counts its runs, which wait for the gate to open.
+    """
+
+    runs = 0
+    gate = threading.Event()
+
+    def check_status(self):
+        type(self).runs += 1
+        self.gate.wait(timeout=5)
+
+
+class OtherCheck(GatedCheck):
+    runs = 0
+
+
+@pytest.fixture(autouse=True)
+def checks():
+    for check in (GatedCheck, OtherCheck):
+        check.runs = 0
+    GatedCheck.gate.set()
+    yield
+    GatedCheck.gate.set()
+
+
+def wait_in_flight(cache: VerdictCache):
+    for future in list(cache._in_flight.values()):
+        future.result(timeout=5)
+
+
+def test_cold_cache_evaluates_once():
+    cache = VerdictCache(ttl=60, stale_ttl=0)
+    GatedCheck.gate.clear()
+    threads = 50
+    barrier = threading.Barrier(threads)
+
+    def get():
+        barrier.wait()
+        return cache.get(GatedCheck())
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(get) for _ in range(threads)]
+        # Let all the callers pile up on the evaluation in flight
+        time.sleep(0.1)
+        GatedCheck.gate.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert GatedCheck.runs == 1
+    assert len({id(verdict) for verdict in results}) == 1
+
+
+def test_stale_verdict_is_served_while_refreshed():
+    cache = VerdictCache(ttl=0.05, stale_ttl=60)
+    verdict = cache.get(GatedCheck())
+    time.sleep(0.06)
+    GatedCheck.gate.clear()
+
+    started_at = time.monotonic()
+    served = [cache.get(GatedCheck()) for _ in range(100)]
+    elapsed = time.monotonic() - started_at
+
+    # Served right away, while one reevaluation waits for the gate
+    assert elapsed < 0.5
+    assert all(stale is verdict for stale in served)
+    assert len(cache._in_flight) == 1
+
+    GatedCheck.gate.set()
+    wait_in_flight(cache)
+    assert GatedCheck.runs == 2
+    assert cache.get(GatedCheck()) is not verdict
+
+
+def test_expired_verdict_is_evaluated_right_away():
+    cache = VerdictCache(ttl=0.05, stale_ttl=0)
+    verdict = cache.get(GatedCheck())
+    time.sleep(0.06)
+
+    assert cache.get(GatedCheck()) is not verdict
+    assert GatedCheck.runs == 2
+
+
+def test_ttl_overrides():
+    cache = VerdictCache(ttl=60, stale_ttl=0, ttls={"OtherCheck": 0})
+
+    for _ in range(3):
+        cache.get(GatedCheck())
+        cache.get(OtherCheck())
+
+    assert GatedCheck.runs == 1
+    assert OtherCheck.runs == 3
+
+
+def test_ttl_overrides_come_from_settings():
+    assert verdicts.verdict_cache.ttls == settings.HEALTHCHECK_VERDICT_TTLS
+    assert verdicts.verdict_cache.default_ttl == settings.HEALTHCHECK_VERDICT_TTL
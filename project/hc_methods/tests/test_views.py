@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from django.urls import reverse
+from health_check.backends import BaseHealthCheckBackend
+from health_check.conf import HEALTH_CHECK
+from health_check.plugins import plugin_dir
+
+from hc_methods import views
+from hc_methods.verdicts import VerdictCache
+
+
+class CountingCheck(BaseHealthCheckBackend):
+    runs = 0
+
+    def check_status(self):
+        CountingCheck.runs += 1
+
+
+class FailingCheck(BaseHealthCheckBackend):
+    def check_status(self):
+        self.add_error("down")
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    CountingCheck.runs = 0
+    monkeypatch.setattr(
+        plugin_dir, "_registry", [(CountingCheck, {}), (FailingCheck, {})]
+    )
+    monkeypatch.setitem(HEALTH_CHECK, "SUBSETS", {"counting": ["CountingCheck"]})
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = VerdictCache(ttl=60, stale_ttl=0)
+    # No background refreshes, so evaluations can be counted
+    monkeypatch.setattr(cache, "start", lambda: None)
+    monkeypatch.setattr(views, "verdict_cache", cache)
+    return cache
+
+
+def test_healthcheck_reports_all_checks(client, plugins, cache):
+    response = client.get(
+        reverse("health_check:health_check_home"), {"format": "json"}
+    )
+
+    assert response.status_code == 500
+    assert response.json() == {
+        "CountingCheck": "working",
+        "FailingCheck": "unknown error: down",
+    }
+
+
+def test_healthcheck_subset(client, plugins, cache):
+    response = client.get(
+        reverse("health_check:health_check_subset", args=["counting"]),
+        {"format": "json"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"CountingCheck": "working"}
+
+
+def test_healthcheck_unknown_subset(client, plugins, cache):
+    response = client.get("/healthcheck/unknown/", {"format": "json"})
+
+    assert response.status_code == 404
+
+
+def test_healthcheck_serves_verdicts_from_cache(client, plugins, cache):
+    url = reverse("health_check:health_check_subset", args=["counting"])
+    timings = []
+    for _ in range(1000):
+        started_at = time.perf_counter()
+        response = client.get(url, {"format": "json"})
+        timings.append(time.perf_counter() - started_at)
+        assert response.status_code == 200
+
+    # One evaluation for a thousand probes
+    assert CountingCheck.runs == 1
+    p99 = sorted(timings)[int(len(timings) * 0.99)]
+    assert p99 < 0.05
@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from hc_methods.storages import HealthCheckFiles
+from hc_methods.workers_check.backends import WorkersHealthCheck
+
+
+@pytest.fixture
+def worker_files(tempdir):
+    alive = HealthCheckFiles(category=HealthCheckFiles.Category.alive)
+    ready = HealthCheckFiles(category=HealthCheckFiles.Category.ready)
+    hostnames = [f"celery@worker-{i}" for i in range(1000)]
+    for hostname in hostnames:
+        alive.set(hostname)
+        ready.set(hostname)
+    return alive, ready, hostnames
+
+
+def test_scan_reads_1k_workers_in_one_pass(worker_files, monkeypatch):
+    alive, _, hostnames = worker_files
+    stat_calls = []
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: stat_calls.append(args))
+
+    heartbeats = alive.scan()
+
+    assert set(heartbeats) == set(hostnames)
+    # The directory entries carry the stat results
+    assert stat_calls == []
+
+
+def test_workers_check_reports_missing_and_inactive(worker_files, settings):
+    alive, _, _ = worker_files
+    settings.HEALTHCHECK_HEARTBEAT_BACKEND = "files"
+    alive.delete("celery@worker-1")
+    long_ago = time.time() - 3600
+    os.utime(alive.folder / "celery@worker-2", (long_ago, long_ago))
+
+    check = WorkersHealthCheck()
+    check.run_check()
+
+    assert [str(error) for error in check.errors] == [
+        "unknown error: Worker celery@worker-1 once started,  is no longer active",
+        "unknown error: Worker celery@worker-2 has been inactive more than "
+        "30 seconds",
+    ]
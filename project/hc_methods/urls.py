@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import HealthCheckView
+
+app_name = "health_check"
+
+urlpatterns = [
+    path("", HealthCheckView.as_view(), name="health_check_home"),
+    path("<str:subset>/", HealthCheckView.as_view(), name="health_check_subset"),
+]
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from health_check.backends import BaseHealthCheckBackend
+from loguru import logger
+
+from .runner import Verdict, evaluate
+
+
+class VerdictCache:
+    """
+    Keeps the latest result of every health check in memory.
+
+    A verdict younger than its TTL is served as is. A stale one, up to
+    `stale_ttl` seconds past the TTL, is still served while the check is
+    reevaluated in the background. Older or missing verdicts are evaluated
+    right away. Concurrent evaluations of the same check are coalesced,
+    callers wait for the one in flight.
+
+    Once started, a background thread keeps the verdicts of all the checks
+    seen so far fresh, so requests are normally served from memory.
+    Background evaluations run concurrently on a pool of their own.
+    """
+
+    def __init__(
+        self, ttl: float, stale_ttl: float, ttls: dict[str, float] | None = None
+    ):
+        self.default_ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = ttls or {}
+        self._lock = threading.Lock()
+        self._verdicts: dict[str, Verdict] = {}
+        self._in_flight: dict[str, Future] = {}
+        # Checks to keep fresh, evaluated on copies
+        self._plugins: dict[str, BaseHealthCheckBackend] = {}
+        self._refresher: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "HEALTHCHECK_RUNNER_MAX_WORKERS", 8),
+            thread_name_prefix="verdict-refresh",
+        )
+
+    def ttl(self, plugin: BaseHealthCheckBackend) -> float:
+        return self.ttls.get(plugin.identifier(), self.default_ttl)
+
+    def get(self, plugin: BaseHealthCheckBackend) -> Verdict:
+        key = plugin.identifier()
+        self._plugins.setdefault(key, plugin)
+
+        verdict = self._verdicts.get(key)
+        if verdict is not None:
+            age = time.monotonic() - verdict.evaluated_at
+            if age < self.ttl(plugin):
+                return verdict
+            if age < self.ttl(plugin) + self.stale_ttl:
+                self.refresh(plugin, wait=False)
+                return verdict
+        return self.refresh(plugin)
+
+    def refresh(self, plugin: BaseHealthCheckBackend, wait=True) -> Verdict | None:
+        key = plugin.identifier()
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if owner:
+            if wait:
+                self._evaluate(key, plugin, future)
+            else:
+                self._executor.submit(self._evaluate, key, plugin, future)
+        return future.result() if wait else None
+
+    def _evaluate(self, key: str, plugin: BaseHealthCheckBackend, future: Future):
+        try:
+            verdict = evaluate(plugin)
+            self._verdicts[key] = verdict
+            future.set_result(verdict)
+        except BaseException as e:
+            logger.exception(f"Could not evaluate {key}")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def start(self):
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(
+                    target=self._refresh_forever, name="verdict-refresher", daemon=True
+                )
+                self._refresher.start()
+
+    def _refresh_forever(self):
+        while True:
+            now = time.monotonic()
+            for key, plugin in list(self._plugins.items()):
+                verdict = self._verdicts.get(key)
+                if verdict is None or now - verdict.evaluated_at >= self.ttl(plugin):
+                    self.refresh(plugin, wait=False)
+            time.sleep(min([self.default_ttl, *self.ttls.values()]) / 2)
+
+
+verdict_cache = VerdictCache(
+    ttl=getattr(settings, "HEALTHCHECK_VERDICT_TTL", 5),
+    stale_ttl=getattr(settings, "HEALTHCHECK_VERDICT_STALE_TTL", 30),
+    ttls=getattr(settings, "HEALTHCHECK_VERDICT_TTLS", {}),
+)
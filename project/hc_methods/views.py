@@ -0,0 +1,30 @@
+from health_check.conf import HEALTH_CHECK
+from health_check.exceptions import ServiceWarning
+from health_check.views import MainView
+
+from .runner import run_checks
+from .verdicts import verdict_cache
+
+
+class HealthCheckView(MainView):
+    """
+    Serves the results of the checks from the verdict cache instead of
+    running all of them on every request. Checks missing from the cache are
+    evaluated concurrently, within the runner deadline.
+    """
+
+    def run_check(self, subset=None):
+        plugins = self.filter_plugins(subset=subset).values()
+        verdict_cache.start()
+        run_checks(plugins, evaluate=verdict_cache.get)
+
+        errors = []
+        for plugin in plugins:
+            if plugin.critical_service:
+                if HEALTH_CHECK.get("WARNINGS_AS_ERRORS", True):
+                    errors.extend(plugin.errors)
+                else:
+                    errors.extend(
+                        e for e in plugin.errors if not isinstance(e, ServiceWarning)
+                    )
+        return errors
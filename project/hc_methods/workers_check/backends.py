@@ -6,7 +6,7 @@ from health_check.exceptions import HealthCheckException
 
 from django.conf import settings
 
-from ..storages import HealthCheckFiles, HealthRecordNotFound
+from ..storages import HealthCheckFiles, get_heartbeat_storage
 from loguru import logger
 
 
@@ -24,23 +24,30 @@ class WorkersHealthCheck(BaseHealthCheckBackend):
     def _check_active(self):
         now = timezone.now()
 
-        active_workers = HealthCheckFiles(category=HealthCheckFiles.Category.alive)
-        ready_workers = HealthCheckFiles(category=HealthCheckFiles.Category.ready)
+        heartbeats = get_heartbeat_storage()
+        if getattr(heartbeats, "warming_up", False):
+            logger.debug(f"{heartbeats} is warming up, skipping the check")
+            return
 
-        logger.debug(f"{active_workers.get_keys()=}  {ready_workers.get_keys()=}")
+        active_workers = heartbeats.scan()
+        ready_workers = HealthCheckFiles(
+            category=HealthCheckFiles.Category.ready
+        ).scan()
 
-        for hostname in ready_workers.get_keys():
-            try:
-                if now - active_workers.get(hostname) > _timeout:
-                    self.add_error(
-                        HealthCheckException(
-                            f"Worker {hostname} has been inactive more than "
-                            f"{settings.HEALTHCHECK_WORKER_TIMEOUT} seconds"
-                        )
-                    )
-            except HealthRecordNotFound:
+        logger.debug(f"{active_workers.keys()=}  {ready_workers.keys()=}")
+
+        for hostname in sorted(ready_workers.keys() - active_workers.keys()):
+            self.add_error(
+                HealthCheckException(
+                    f"Worker {hostname} once started,  " f"is no longer active"
+                )
+            )
+
+        for hostname in sorted(ready_workers.keys() & active_workers.keys()):
+            if now - active_workers[hostname] > _timeout:
                 self.add_error(
                     HealthCheckException(
-                        f"Worker {hostname} once started,  " f"is no longer active"
+                        f"Worker {hostname} has been inactive more than "
+                        f"{settings.HEALTHCHECK_WORKER_TIMEOUT} seconds"
                     )
                 )
@@ -157,6 +157,54 @@ CELERY_TASK_ROUTES = {
 CELERYBEAT_SYNC_EVERY = 0
 
 HEALTHCHECK_WORKER_TIMEOUT = 30
+# Seconds between worker heartbeats, None derives it from the timeout above
+HEALTHCHECK_WORKER_HEARTBEAT_INTERVAL = None
 HEALTHCHECK_CELERY_QUEUE_TIMEOUT = 3
+# The round trip probes of the queues are shared by all the queue checks
+# for this many seconds
+HEALTHCHECK_CELERY_PROBE_TTL = 2
+# The active queues inspection is shared by all the queue checks for this
+# many seconds, and waits for at most the timeout or the replies of the
+# limit workers (None waits for all the workers until the timeout)
+HEALTHCHECK_CELERY_ACTIVE_QUEUES_TTL = 2
+HEALTHCHECK_CELERY_INSPECT_TIMEOUT = 1.0
+HEALTHCHECK_CELERY_INSPECT_LIMIT = None
+# Backlog thresholds of the routed queues (Redis broker only): messages
+# waiting, seconds the oldest one has waited and growth in messages per
+# second over the trend window (seconds), None disables a threshold
+HEALTHCHECK_QUEUE_MAX_DEPTH = 10000
+HEALTHCHECK_QUEUE_MAX_LAG = 60
+HEALTHCHECK_QUEUE_MAX_GROWTH = None
+HEALTHCHECK_QUEUE_TREND_WINDOW = 60
+# Seconds the backlog measurement is shared by all the queue checks
+HEALTHCHECK_QUEUE_DEPTH_TTL = 2
 HEALTHCHECK_STORAGE_TTL = 2000
+# Health records layout in Redis: "keys" (a key per task or worker)
+# or "hash" (a hash per category holding epoch milliseconds)
+HEALTHCHECK_STORAGE_LAYOUT = "keys"
+# Seconds a stored health timestamp may lag behind before it is rewritten
+HEALTHCHECK_STORAGE_RESOLUTION = 1
 HEALTHCHECK_PROBE_INTERVAL = 2
+# Seconds a pooled Redis connection may idle before it is PINGed on reuse
+HEALTHCHECK_REDIS_HEALTH_CHECK_INTERVAL = 30
+# Seconds the cached periodic task schedules are trusted without checking
+# django_celery_beat's change marker, 0 checks it on every request.
+# The last runs are read from the database on every request regardless
+HEALTHCHECK_BEAT_SCHEDULE_FRESHNESS = 0
+# Worker heartbeats storage: "files" (one file per worker),
+# "mmap" (a shared memory-mapped table with a fixed number of slots)
+# or "events" (worker heartbeat events, requires workers to run with --events)
+HEALTHCHECK_HEARTBEAT_BACKEND = "files"
+HEALTHCHECK_HEARTBEAT_SLOTS = 1024
+# Upper bounds of the in-memory state kept by the events monitors
+HEALTHCHECK_STATE_MAX_WORKERS = 1000
+HEALTHCHECK_STATE_MAX_TASKS = 10000
+# Seconds a health check result is served from memory, per check identifier
+# overrides and how long a stale result may be served while being refreshed
+HEALTHCHECK_VERDICT_TTL = 5
+HEALTHCHECK_VERDICT_TTLS = {}
+HEALTHCHECK_VERDICT_STALE_TTL = 30
+# Health checks run concurrently on this many threads, and the ones still
+# running after the deadline (seconds) are reported as timed out
+HEALTHCHECK_RUNNER_MAX_WORKERS = 8
+HEALTHCHECK_RUNNER_DEADLINE = 5
@@ -4,5 +4,5 @@ from django.urls import path, include
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("healthcheck/", include('health_check.urls')),
+    path("healthcheck/", include("hc_methods.urls")),
 ]
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Awaitable, Callable, NamedTuple
+
+from loguru import logger
+
+
+class CheckResult(NamedTuple):
+    status: int
+    data: dict
+    #: Event loop time the check has finished at.
+    checked_at: float
+
+
+class HealthcheckCache:
+    """
+    Keeps the latest healthcheck result for `ttl` seconds. Requests arriving
+    while a check is in progress await that same check instead of starting
+    their own, and a background task, when `refresh_interval` is set, keeps
+    the result fresh so requests are normally served from memory.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[], Awaitable[CheckResult]],
+        ttl: float,
+        refresh_interval: float | None = None,
+    ):
+        self.check = check
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._result: CheckResult | None = None
+        self._in_flight: asyncio.Future | None = None
+        self._refresher: asyncio.Task | None = None
+
+    async def get(self) -> CheckResult:
+        loop = asyncio.get_running_loop()
+        if self._result and loop.time() - self._result.checked_at < self.ttl:
+            return self._result
+        return await self.refresh()
+
+    async def refresh(self) -> CheckResult:
+        if self._in_flight is None:
+            self._in_flight = asyncio.ensure_future(self._check())
+            self._in_flight.add_done_callback(self._done)
+        # A cancelled request must not cancel the check for the others
+        return await asyncio.shield(self._in_flight)
+
+    async def _check(self) -> CheckResult:
+        self._result = await self.check()
+        return self._result
+
+    def _done(self, future: asyncio.Future):
+        if self._in_flight is future:
+            self._in_flight = None
+
+    async def _refresh_forever(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Healthcheck refresh has failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self, app=None):
+        if self.refresh_interval and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self, app=None):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+
+__all__ = ["CheckResult", "HealthcheckCache"]
@@ -14,6 +14,8 @@ class HealthCheckException(Exception):
 
 class AsyncBaseHealthCheckBackend:
     critical_service = True
+    #: Seconds the last run of the check took.
+    time_taken: float | None = None
 
     def __init__(self):
         self.errors = []
@@ -30,6 +32,9 @@ class AsyncBaseHealthCheckBackend:
             if self.critical_service:
                 status = HTTPStatus.HTTP_500_INTERNAL_SERVER_ERROR
             self.add_error(e, e)
+        except asyncio.CancelledError:
+            # Cancelled by the deadline or on shutdown, not a failure of the check
+            raise
         except BaseException:
             logger.exception("Unexpected Error!")
             raise
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from redis import asyncio as aioredis
+
+from ..storages import Category, get_healthcheck_storage
+from ..utils import BeatCheckConfig, RedisConfig
+from .base import AsyncBaseHealthCheckBackend, HealthCheckException
+
+
+class BeatTasksHealthCheck(AsyncBaseHealthCheckBackend):
+    """
+    Asyncio counterpart of `hc_methods.beat_task_intervals_check.BeatTasksHealthCheck`
+    for the interval schedules. The intervals come from the config, the last
+    runs from the Redis health store.
+    """
+
+    critical_service = False
+
+    def __init__(
+        self,
+        pool: aioredis.ConnectionPool,
+        redis_config: RedisConfig,
+        config: BeatCheckConfig,
+    ):
+        super().__init__()
+        self.storage = get_healthcheck_storage(pool, redis_config, Category.tasks)
+        self.ttl = redis_config.storage_ttl
+        self.intervals = {
+            task: timedelta(seconds=interval) for task, interval in config.tasks.items()
+        }
+        self.probe_interval = timedelta(seconds=config.probe_interval)
+
+    def check_interval(
+        self, run_every: timedelta, last_run_at: datetime | None, now: datetime
+    ) -> bool:
+        if not last_run_at:
+            # Record removed from redis, but interval is less than ttl
+            if not self.ttl or run_every < timedelta(seconds=self.ttl):
+                return False
+            # The record may have expired before the next run is due
+            return True
+        return now < last_run_at + run_every + self.probe_interval
+
+    async def check_status(self):
+        if not self.intervals:
+            return
+
+        last_runs = await self.storage.get_many(self.intervals)
+        logger.info(f"Getting timestamps for tasks: {last_runs}")
+        now = datetime.now(timezone.utc)
+
+        failed = [
+            task
+            for task, run_every in self.intervals.items()
+            if not self.check_interval(run_every, last_runs.get(task), now)
+        ]
+        for task in failed:
+            self.add_error(
+                HealthCheckException(f"Sheduled task {task} has not run for too long")
+            )
+
+
+__all__ = ["BeatTasksHealthCheck"]
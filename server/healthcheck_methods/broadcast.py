@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import json
+import time
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+from loguru import logger
+from redis import asyncio as aioredis
+
+
+class AsyncBroadcastPing:
+    """
+    Pings Celery workers over a Redis broker right from the event loop.
+
+    Speaks kombu's pidbox protocol as it is laid out on Redis: the ping is
+    published to the fanout channel of the `celery.pidbox` exchange, workers
+    route their replies through the `reply.celery.pidbox` binding table into
+    a list of our own. Concurrent callers share the ping in flight.
+    """
+
+    EXCHANGE = "celery.pidbox"
+    REPLY_EXCHANGE = "reply.celery.pidbox"
+    # kombu's separator of the binding table fields
+    SEP = "\x06\x16"
+    # Seconds on top of the timeout a ping may take, past them the broker
+    # is considered stalled and the ping is given up
+    STALL_MARGIN = 1.0
+
+    def __init__(
+        self, broker_url: str, timeout: float = 1.0, limit: int | None = None
+    ):
+        self.client = aioredis.Redis.from_url(broker_url)
+        db = int(urlsplit(broker_url).path.strip("/") or 0)
+        self.topic = f"/{db}.{self.EXCHANGE}"
+        self.timeout = timeout
+        self.limit = limit
+        # Identifies the reply queue of this process, like kombu's Mailbox.oid
+        self.oid = str(uuid4())
+        self.reply_queue = f"{self.oid}.{self.REPLY_EXCHANGE}"
+        self.binding_table = f"_kombu.binding.{self.REPLY_EXCHANGE}"
+        self.binding = self.SEP.join([self.oid, "", self.reply_queue])
+        self._bound = False
+        self._in_flight: asyncio.Future | None = None
+
+    async def ping(self) -> list[dict]:
+        if self._in_flight is None:
+            self._in_flight = asyncio.ensure_future(
+                asyncio.wait_for(self._ping(), self.timeout + self.STALL_MARGIN)
+            )
+            self._in_flight.add_done_callback(self._done)
+        # A cancelled caller must not cancel the ping for the others
+        return await asyncio.shield(self._in_flight)
+
+    def _done(self, future: asyncio.Future):
+        if self._in_flight is future:
+            self._in_flight = None
+
+    async def _ping(self) -> list[dict]:
+        if not self._bound:
+            await self.client.sadd(self.binding_table, self.binding)
+            self._bound = True
+        # Late replies of the previous pings
+        await self.client.delete(self.reply_queue)
+
+        ticket = str(uuid4())
+        await self.client.publish(self.topic, self._message(ticket))
+
+        replies = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        while self.limit is None or len(replies) < self.limit:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            item = await self.client.brpop([self.reply_queue], timeout=remaining)
+            if item is None:
+                break
+            reply = self._parse_reply(item[1], ticket)
+            if reply is not None:
+                replies.append(reply)
+        return replies
+
+    def _message(self, ticket: str) -> str:
+        body = {
+            "method": "ping",
+            "arguments": {},
+            "destination": None,
+            "pattern": None,
+            "matcher": None,
+            "ticket": ticket,
+            "reply_to": {"exchange": self.REPLY_EXCHANGE, "routing_key": self.oid},
+        }
+        return json.dumps(
+            {
+                "body": base64.b64encode(json.dumps(body).encode()).decode(),
+                "content-encoding": "utf-8",
+                "content-type": "application/json",
+                "headers": {"clock": 1, "expires": time.time() + self.timeout},
+                "properties": {
+                    "body_encoding": "base64",
+                    "delivery_info": {"exchange": self.EXCHANGE, "routing_key": ""},
+                    "delivery_mode": 1,
+                    "delivery_tag": str(uuid4()),
+                    "priority": 0,
+                },
+            }
+        )
+
+    @staticmethod
+    def _parse_reply(raw: bytes, ticket: str) -> dict | None:
+        try:
+            message = json.loads(raw)
+            if message["headers"].get("ticket") != ticket:
+                return None
+            body = message["body"]
+            if message["properties"].get("body_encoding") == "base64":
+                body = base64.b64decode(body)
+            return json.loads(body)
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Unexpected ping reply {raw!r}")
+            return None
+
+    async def close(self):
+        await self.client.srem(self.binding_table, self.binding)
+        await self.client.delete(self.reply_queue)
+        await self.client.close()
+
+
+__all__ = ["AsyncBroadcastPing"]
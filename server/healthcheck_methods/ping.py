@@ -1,21 +1,47 @@
 import asyncio
 from celery import Celery
-from ..utils import Config
+from ..utils import CeleryConfig
 
 from loguru import logger
 
-from .base import AsyncBaseHealthCheckBackend
+from .base import AsyncBaseHealthCheckBackend, HealthCheckException
+from .broadcast import AsyncBroadcastPing
+
+
+def create_celery_app(config: CeleryConfig) -> Celery:
+    return Celery("main", broker=config.broker, backend=config.backend)
 
 
 class CeleryPingBackend(AsyncBaseHealthCheckBackend):
     CORRECT_PING_RESPONSE = {"ok": "pong"}
 
+    def __init__(
+        self,
+        celery_app: Celery,
+        config: CeleryConfig,
+        broadcast: AsyncBroadcastPing | None = None,
+    ):
+        super().__init__()
+        self.celery_app = celery_app
+        self.timeout = config.ping_timeout
+        self.limit = config.expected_workers
+        self.broadcast = broadcast
+
+    def _ping(self):
+        # Broker connections are reused across requests
+        with self.celery_app.pool.acquire(block=True) as connection:
+            return self.celery_app.control.ping(
+                timeout=self.timeout, limit=self.limit, connection=connection
+            )
+
     async def ping_celery(self):
-        config = Config().load()
-        celery_app = Celery(
-            "main", broker=config.celery.broker, backend=config.celery.backend
-        )
-        res = await asyncio.to_thread(celery_app.control.ping)
+        if self.broadcast:
+            try:
+                return await self.broadcast.ping()
+            except asyncio.TimeoutError:
+                raise HealthCheckException("The ping has stalled on the broker")
+
+        res = await asyncio.to_thread(self._ping)
 
         return res
 
@@ -33,4 +59,4 @@ class CeleryPingBackend(AsyncBaseHealthCheckBackend):
         return await self._check_ping_result(ping_data)
 
 
-__all__ = ["CeleryPingBackend"]
+__all__ = ["CeleryPingBackend", "create_celery_app"]
@@ -0,0 +1,118 @@
+import asyncio
+import json
+from collections import deque
+from typing import Iterable, NamedTuple
+
+from redis import asyncio as aioredis
+
+from ..utils import QueuesCheckConfig
+from .base import AsyncBaseHealthCheckBackend
+
+
+class QueueDepth(NamedTuple):
+    #: Messages waiting in the queue.
+    depth: int
+    #: Seconds the oldest message has been waiting at least, as observed by
+    #: the consecutive measurements.
+    lag: float
+    #: Change of the depth over the trend window, messages per second.
+    growth: float
+
+
+class AsyncQueueDepthMonitor:
+    """
+    Asyncio counterpart of `hc_methods.queues_check.depth.QueueDepthMonitor`.
+    Depths and the oldest messages of all the queues on a Redis broker are
+    read in one pipelined round trip. Keeps the observations between the
+    measurements, so one instance is shared by the whole application.
+    """
+
+    def __init__(self, broker_url: str, trend_window: float = 60):
+        self.client = aioredis.Redis.from_url(broker_url)
+        self.trend_window = trend_window
+        # queue -> (delivery tag of the oldest message, first seen at)
+        self._oldest: dict[str, tuple[str, float]] = {}
+        # queue -> (measured at, depth)
+        self._history: dict[str, deque] = {}
+
+    async def measure(self, queues: Iterable[str]) -> dict[str, QueueDepth]:
+        queues = list(queues)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for queue in queues:
+                pipe.llen(queue)
+                pipe.lindex(queue, -1)
+            values = await pipe.execute()
+        now = asyncio.get_running_loop().time()
+
+        return {
+            queue: QueueDepth(
+                depth=depth,
+                lag=self._lag(queue, oldest, now),
+                growth=self._growth(queue, depth, now),
+            )
+            for queue, depth, oldest in zip(queues, values[::2], values[1::2])
+        }
+
+    def _lag(self, queue: str, oldest: bytes | None, now: float) -> float:
+        if oldest is None:
+            self._oldest.pop(queue, None)
+            return 0.0
+        try:
+            tag = json.loads(oldest)["properties"]["delivery_tag"]
+        except (ValueError, KeyError, TypeError):
+            tag = oldest
+        seen_tag, seen_at = self._oldest.get(queue, (None, now))
+        if seen_tag != tag:
+            self._oldest[queue] = (tag, now)
+            return 0.0
+        return now - seen_at
+
+    def _growth(self, queue: str, depth: int, now: float) -> float:
+        history = self._history.setdefault(queue, deque())
+        history.append((now, depth))
+        while history and now - history[0][0] > self.trend_window:
+            history.popleft()
+        first_at, first_depth = history[0]
+        if now == first_at:
+            return 0.0
+        return (depth - first_depth) / (now - first_at)
+
+    async def close(self):
+        await self.client.close()
+
+
+class QueueDepthHealthCheck(AsyncBaseHealthCheckBackend):
+    critical_service = False
+
+    def __init__(self, monitor: AsyncQueueDepthMonitor, config: QueuesCheckConfig):
+        super().__init__()
+        self.monitor = monitor
+        self.queues = config.queues
+        self.max_depth = config.max_depth
+        self.max_lag = config.max_lag
+        self.max_growth = config.max_growth
+        #: Backlog of the queues measured by the last run.
+        self.depths: dict[str, QueueDepth] = {}
+
+    async def check_status(self):
+        self.depths = await self.monitor.measure(self.queues)
+
+        for queue, depth in self.depths.items():
+            if self.max_depth is not None and depth.depth > self.max_depth:
+                self.add_error(
+                    f"{depth.depth} messages are waiting in the queue {queue}, "
+                    f"more than {self.max_depth}"
+                )
+            if self.max_lag is not None and depth.lag > self.max_lag:
+                self.add_error(
+                    f"The oldest message of the queue {queue} has been waiting "
+                    f"for {depth.lag:.0f} seconds, more than {self.max_lag}"
+                )
+            if self.max_growth is not None and depth.growth > self.max_growth:
+                self.add_error(
+                    f"The queue {queue} grows by {depth.growth:.1f} messages "
+                    f"per second, more than {self.max_growth}"
+                )
+
+
+__all__ = ["AsyncQueueDepthMonitor", "QueueDepth", "QueueDepthHealthCheck"]
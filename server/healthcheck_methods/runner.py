@@ -0,0 +1,55 @@
+import asyncio
+from typing import Iterable
+
+from loguru import logger
+
+from .base import AsyncBaseHealthCheckBackend, HealthCheckException, HTTPStatus
+
+
+def _failed_status(backend: AsyncBaseHealthCheckBackend) -> HTTPStatus:
+    if backend.critical_service:
+        return HTTPStatus.HTTP_500_INTERNAL_SERVER_ERROR
+    return HTTPStatus.HTTP_200_OK
+
+
+async def _run_check(
+    backend: AsyncBaseHealthCheckBackend, deadline: float
+) -> HTTPStatus:
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    try:
+        status = await asyncio.wait_for(
+            backend.run_check(), timeout=max(deadline - started_at, 0)
+        )
+    except asyncio.TimeoutError as e:
+        backend.add_error(
+            HealthCheckException("The check did not finish before the deadline"), e
+        )
+        status = _failed_status(backend)
+    except Exception as e:
+        # A broken check, e.g. with Redis unreachable, must not take the
+        # results of the others down with it
+        backend.add_error(HealthCheckException(f"The check has failed: {e!r}"), e)
+        status = _failed_status(backend)
+    finally:
+        backend.time_taken = loop.time() - started_at
+    return status
+
+
+async def run_checks(
+    backends: Iterable[AsyncBaseHealthCheckBackend], deadline: float
+) -> HTTPStatus:
+    """
+    Runs the checks concurrently and returns the worst of their statuses.
+    Checks still running `deadline` seconds from now are reported as timed
+    out, each check keeps the seconds it took in `time_taken`.
+    """
+    deadline = asyncio.get_running_loop().time() + deadline
+    statuses = await asyncio.gather(
+        *(_run_check(backend, deadline) for backend in backends)
+    )
+    logger.debug(f"Checks have finished with {statuses}")
+    return max(statuses, default=HTTPStatus.HTTP_200_OK)
+
+
+__all__ = ["run_checks"]
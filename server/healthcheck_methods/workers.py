@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from redis import asyncio as aioredis
+
+from ..storages import AsyncHashHealthcheckStorage, Category, get_healthcheck_storage
+from ..utils import RedisConfig, WorkersCheckConfig
+from .base import AsyncBaseHealthCheckBackend, HealthCheckException
+
+
+class WorkersHealthCheck(AsyncBaseHealthCheckBackend):
+    """
+    Asyncio counterpart of `hc_methods.workers_check.WorkersHealthCheck`,
+    reads the heartbeats EventsCamera writes to the Redis health store.
+    """
+
+    critical_service = False
+
+    def __init__(
+        self,
+        pool: aioredis.ConnectionPool,
+        redis_config: RedisConfig,
+        config: WorkersCheckConfig,
+    ):
+        super().__init__()
+        self.heartbeats = get_healthcheck_storage(pool, redis_config, Category.workers)
+        self.ready = None
+        if redis_config.storage_layout == "hash":
+            # Written once when a worker starts, they never go stale
+            self.ready = AsyncHashHealthcheckStorage(pool, Category.ready, ttl=None)
+        self.hostnames = config.hostnames
+        self.timeout = config.timeout
+
+    async def _expected_workers(self) -> list[str]:
+        if self.hostnames:
+            return self.hostnames
+        if self.ready is not None:
+            return list(await self.ready.get_all())
+        return []
+
+    async def check_status(self):
+        hostnames = await self._expected_workers()
+        if not hostnames:
+            logger.debug("No workers are expected, skipping the check")
+            return
+
+        heartbeats: dict[str, datetime | None] = await self.heartbeats.get_many(
+            hostnames
+        )
+        now = datetime.now(timezone.utc)
+        timeout = timedelta(seconds=self.timeout)
+
+        for hostname, heartbeat in sorted(heartbeats.items()):
+            if heartbeat is None:
+                self.add_error(
+                    HealthCheckException(
+                        f"Worker {hostname} once started,  is no longer active"
+                    )
+                )
+            elif now - heartbeat > timeout:
+                self.add_error(
+                    HealthCheckException(
+                        f"Worker {hostname} has been inactive more than "
+                        f"{self.timeout} seconds"
+                    )
+                )
+
+
+__all__ = ["WorkersHealthCheck"]
@@ -1,21 +1,121 @@
 import asyncio
+import signal
+from functools import partial
 from pathlib import Path
 from aiohttp import web
 
+from .cache import HealthcheckCache
+from .healthcheck_methods.broadcast import AsyncBroadcastPing
+from .healthcheck_methods.ping import create_celery_app
+from .healthcheck_methods.queues import AsyncQueueDepthMonitor
 from .routes import setup_routes
-from .utils import  Config
+from .storages import create_connection_pool, warm_up_connection_pool
+from .utils import config_store
+from .views import run_healthcheck
 
-#
-#
-# async def setup_redis(app, conf):
-#     redis = await init_redis(conf.redis)
-#     app["redis"] = redis
-#     return redis
+
+async def setup_redis(app, conf):
+    redis = create_connection_pool(conf.redis, db=conf.redis.storage_db)
+    app["redis"] = redis
+
+    async def open_redis(app):
+        await warm_up_connection_pool(redis, conf.redis.minsize)
+
+    async def close_redis(app):
+        await redis.disconnect()
+
+    app.on_startup.append(open_redis)
+    app.on_cleanup.append(close_redis)
+    return redis
+
+
+async def setup_celery(app, conf):
+    celery_app = create_celery_app(conf.celery)
+    app["celery"] = celery_app
+
+    async def close_celery(app):
+        celery_app.close()
+
+    app.on_cleanup.append(close_celery)
+
+    app["broadcast_ping"] = None
+    if conf.celery.native_ping and conf.celery.broker.startswith("redis"):
+        broadcast_ping = AsyncBroadcastPing(
+            conf.celery.broker,
+            timeout=conf.celery.ping_timeout,
+            limit=conf.celery.expected_workers,
+        )
+        app["broadcast_ping"] = broadcast_ping
+
+        async def close_broadcast_ping(app):
+            await broadcast_ping.close()
+
+        app.on_cleanup.append(close_broadcast_ping)
+
+    app["queue_depth"] = None
+    if conf.celery.broker.startswith("redis"):
+        queue_depth = AsyncQueueDepthMonitor(
+            conf.celery.broker, trend_window=conf.checks.queues.trend_window
+        )
+        app["queue_depth"] = queue_depth
+
+        async def close_queue_depth(app):
+            await queue_depth.close()
+
+        app.on_cleanup.append(close_queue_depth)
+    return celery_app
+
+
+async def setup_healthcheck_cache(app, conf):
+    cache = HealthcheckCache(
+        partial(run_healthcheck, app),
+        ttl=conf.cache_ttl,
+        refresh_interval=conf.refresh_interval,
+    )
+    app["healthcheck_cache"] = cache
+    app.on_startup.append(cache.start)
+    app.on_cleanup.append(cache.stop)
+    return cache
+
+
+def setup_reload(app, cache):
+    """
+    Reloads the config on SIGHUP. Checks read the reloaded config on their
+    next run; connections, the Celery app and the port are set up once, so
+    their settings take a restart.
+    """
+
+    def reload_config():
+        config = config_store.reload()
+        cache.ttl = config.cache_ttl
+        if cache.refresh_interval and config.refresh_interval:
+            cache.refresh_interval = config.refresh_interval
+
+    async def add_signal_handler(app):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_config)
+        except (NotImplementedError, AttributeError):
+            # No SIGHUP or no signal handlers on this platform
+            pass
+
+    async def remove_signal_handler(app):
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, AttributeError):
+            pass
+
+    app.on_startup.append(add_signal_handler)
+    app.on_cleanup.append(remove_signal_handler)
 
 
 async def init():
-    config = Config().load()
+    config = config_store.current
     app = web.Application()
+    if config.redis:
+        await setup_redis(app, config)
+    await setup_celery(app, config)
+    cache = await setup_healthcheck_cache(app, config)
+    setup_reload(app, cache)
     setup_routes(app)
     port = config.port
     return app, port
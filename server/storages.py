@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Iterable
+
+from redis import asyncio as aioredis
+
+from .utils import RedisConfig
+
+# Idle connections are PINGed before reuse once this many seconds have passed,
+# instead of PINGing on every call.
+HEALTH_CHECK_INTERVAL = 30
+
+
+def create_connection_pool(config: RedisConfig, db: int) -> aioredis.ConnectionPool:
+    return aioredis.ConnectionPool.from_url(
+        f"redis://{config.host}:{config.port}/{db}",
+        max_connections=config.maxsize,
+        health_check_interval=HEALTH_CHECK_INTERVAL,
+    )
+
+
+async def warm_up_connection_pool(pool: aioredis.ConnectionPool, size: int):
+    """
+    Opens `size` connections of the pool ahead of the first requests.
+    """
+    connections = [await pool.get_connection("PING") for _ in range(size)]
+    for connection in connections:
+        await pool.release(connection)
+
+
+class AsyncHealthcheckStorage:
+    """
+    Asyncio counterpart of `hc_methods.storages.HealthcheckStorage`,
+    reads the same keys over a shared connection pool. The records are
+    written by the project only.
+    """
+
+    def __init__(self, pool: aioredis.ConnectionPool, ttl: int = None):
+        self.client = aioredis.Redis(connection_pool=pool)
+        self.ttl = ttl
+
+    async def get(self, key: str) -> datetime:
+        value = await self.client.get(key)
+        if value:
+            return datetime.fromisoformat(value.decode())
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, datetime | None]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.client.mget(keys)
+        return {
+            key: datetime.fromisoformat(value.decode()) if value else None
+            for key, value in zip(keys, values)
+        }
+
+
+class Category(str, Enum):
+    tasks = "tasks"
+    workers = "workers"
+    ready = "ready"
+
+
+class AsyncHashHealthcheckStorage:
+    """
+    Asyncio counterpart of `hc_methods.storages.HashHealthcheckStorage`,
+    reads the hash of a category holding epoch milliseconds. Records older
+    than `ttl` are treated as missing.
+    """
+
+    def __init__(self, pool: aioredis.ConnectionPool, category: Category, ttl=None):
+        self.client = aioredis.Redis(connection_pool=pool)
+        self.key = f"healthcheck:{category.value}"
+        self.ttl = ttl
+
+    def _to_datetime(self, value: bytes | None) -> datetime | None:
+        if value is None:
+            return None
+        timestamp = datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+        now = datetime.now(timezone.utc)
+        if self.ttl and now - timestamp > timedelta(seconds=self.ttl):
+            return None
+        return timestamp
+
+    async def get(self, key: str) -> datetime | None:
+        return self._to_datetime(await self.client.hget(self.key, key))
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, datetime | None]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.client.hmget(self.key, keys)
+        return {key: self._to_datetime(value) for key, value in zip(keys, values)}
+
+    async def get_all(self) -> dict[str, datetime]:
+        values = await self.client.hgetall(self.key)
+        records = {
+            key.decode(): self._to_datetime(value) for key, value in values.items()
+        }
+        return {key: value for key, value in records.items() if value}
+
+
+def get_healthcheck_storage(
+    pool: aioredis.ConnectionPool, config: RedisConfig, category: Category
+):
+    """
+    Returns the storage of the health records of the given category,
+    in the layout the project writes them in, see `RedisConfig.storage_layout`.
+    """
+    if config.storage_layout == "hash":
+        return AsyncHashHealthcheckStorage(pool, category, ttl=config.storage_ttl)
+    return AsyncHealthcheckStorage(pool, ttl=config.storage_ttl)
+
+
+__all__ = [
+    "create_connection_pool",
+    "warm_up_connection_pool",
+    "AsyncHealthcheckStorage",
+    "AsyncHashHealthcheckStorage",
+    "Category",
+    "get_healthcheck_storage",
+]
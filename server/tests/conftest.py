@@ -0,0 +1,57 @@
+import fakeredis
+import pytest
+from aiohttp import web
+from redis import asyncio as aioredis
+
+from server.main import setup_celery, setup_healthcheck_cache
+from server.routes import setup_routes
+from server.utils import Config, config_store
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = Config.parse_obj(
+        {
+            "redis": {
+                "host": "localhost",
+                "port": "6379",
+                "db": 7,
+                "minsize": 1,
+                "maxsize": 5,
+            },
+            "celery": {
+                "broker": "memory://",
+                "backend": "cache+memory://",
+                "ping_timeout": 0.01,
+            },
+            "cache_ttl": 2.0,
+            "refresh_interval": None,
+        }
+    )
+    monkeypatch.setattr(config_store, "_config", config)
+    return config
+
+
+@pytest.fixture
+def redis_pool():
+    """
+    In-memory Redis standing in for the health store.
+    """
+    return aioredis.ConnectionPool(
+        connection_class=fakeredis.FakeAsyncConnection, server=fakeredis.FakeServer()
+    )
+
+
+@pytest.fixture
+def redis(redis_pool):
+    return aioredis.Redis(connection_pool=redis_pool)
+
+
+@pytest.fixture
+async def app(config, redis_pool):
+    app = web.Application()
+    app["redis"] = redis_pool
+    await setup_celery(app, config)
+    await setup_healthcheck_cache(app, config)
+    setup_routes(app)
+    return app
@@ -0,0 +1,105 @@
+import asyncio
+import base64
+import json
+
+import fakeredis
+import pytest
+
+from server.healthcheck_methods.base import HealthCheckException
+from server.healthcheck_methods.broadcast import AsyncBroadcastPing
+from server.healthcheck_methods.ping import CeleryPingBackend
+
+
+@pytest.fixture
+def broker():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+async def broadcast(broker):
+    broadcast = AsyncBroadcastPing("redis://localhost:6379/0", timeout=0.2)
+    broadcast.client = broker
+    yield broadcast
+    await broadcast.close()
+
+
+async def run_workers(broker, hostnames, published: list):
+    """
+    Replies to the pings like the pidbox of Celery workers does.
+    """
+    pubsub = broker.pubsub()
+    await pubsub.subscribe("/0.celery.pidbox")
+    try:
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True)
+            if message is None:
+                await asyncio.sleep(0.001)
+                continue
+            ping = json.loads(base64.b64decode(json.loads(message["data"])["body"]))
+            published.append(ping)
+            bindings = await broker.smembers("_kombu.binding.reply.celery.pidbox")
+            queue = next(iter(bindings)).decode().split("\x06\x16")[2]
+            for hostname in hostnames:
+                reply = {
+                    "body": base64.b64encode(
+                        json.dumps({hostname: {"ok": "pong"}}).encode()
+                    ).decode(),
+                    "headers": {"ticket": ping["ticket"]},
+                    "properties": {"body_encoding": "base64"},
+                }
+                await broker.lpush(queue, json.dumps(reply))
+    finally:
+        await pubsub.unsubscribe()
+
+
+@pytest.fixture
+async def workers(broker):
+    published = []
+    task = asyncio.create_task(run_workers(broker, ["w1", "w2"], published))
+    await asyncio.sleep(0.01)
+    yield published
+    task.cancel()
+
+
+async def test_ping_collects_replies(broadcast, workers):
+    replies = await broadcast.ping()
+
+    assert sorted(replies, key=str) == [{"w1": {"ok": "pong"}}, {"w2": {"ok": "pong"}}]
+
+
+async def test_ping_stops_at_limit(broadcast, workers):
+    broadcast.limit = 1
+    loop = asyncio.get_running_loop()
+
+    started_at = loop.time()
+    replies = await broadcast.ping()
+
+    assert len(replies) == 1
+    assert loop.time() - started_at < broadcast.timeout
+
+
+async def test_concurrent_pings_are_shared(broadcast, workers):
+    results = await asyncio.gather(*(broadcast.ping() for _ in range(50)))
+
+    assert len(workers) == 1
+    assert all(len(replies) == 2 for replies in results)
+
+
+async def test_replies_to_other_pings_are_skipped():
+    assert AsyncBroadcastPing._parse_reply(b"not json", "ticket") is None
+    reply = json.dumps(
+        {"body": "{}", "headers": {"ticket": "other"}, "properties": {}}
+    )
+    assert AsyncBroadcastPing._parse_reply(reply.encode(), "ticket") is None
+
+
+async def test_stalled_ping_is_given_up(broadcast, config, monkeypatch):
+    async def stall(*args, **kwargs):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(broadcast.client, "publish", stall)
+    monkeypatch.setattr(AsyncBroadcastPing, "STALL_MARGIN", 0.05)
+    backend = CeleryPingBackend(None, config.celery, broadcast=broadcast)
+
+    with pytest.raises(HealthCheckException):
+        await backend.ping_celery()
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from server.cache import CheckResult, HealthcheckCache
+
+
+class CountingCheck:
+    def __init__(self, delay: float = 0.01, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self) -> CheckResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return CheckResult(
+            status=200, data={}, checked_at=asyncio.get_running_loop().time()
+        )
+
+
+async def test_concurrent_requests_share_one_check():
+    check = CountingCheck()
+    cache = HealthcheckCache(check, ttl=0)
+
+    results = await asyncio.gather(*(cache.get() for _ in range(1000)))
+
+    assert check.calls == 1
+    assert len({id(result) for result in results}) == 1
+
+
+async def test_result_is_served_until_ttl():
+    check = CountingCheck(delay=0)
+    cache = HealthcheckCache(check, ttl=0.05)
+
+    await cache.get()
+    await cache.get()
+    assert check.calls == 1
+
+    await asyncio.sleep(0.06)
+    await cache.get()
+    assert check.calls == 2
+
+
+async def test_failed_check_is_retried():
+    check = CountingCheck(error=RuntimeError("down"))
+    cache = HealthcheckCache(check, ttl=10)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await cache.get()
+    assert check.calls == 2
+
+
+async def test_cancelled_request_does_not_cancel_check():
+    check = CountingCheck(delay=0.02)
+    cache = HealthcheckCache(check, ttl=10)
+
+    request = asyncio.ensure_future(cache.get())
+    await asyncio.sleep(0)
+    other = asyncio.ensure_future(cache.get())
+    request.cancel()
+
+    assert (await other).status == 200
+    assert check.calls == 1
+
+
+async def test_refresher_keeps_result_fresh():
+    check = CountingCheck(delay=0)
+    cache = HealthcheckCache(check, ttl=10, refresh_interval=0.01)
+
+    await cache.start()
+    await asyncio.sleep(0.05)
+    await cache.stop()
+
+    assert check.calls > 1
+    calls = check.calls
+    await cache.get()
+    assert check.calls == calls
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+
+from server.healthcheck_methods.base import (
+    AsyncBaseHealthCheckBackend,
+    HealthCheckException,
+)
+from server.healthcheck_methods.beat import BeatTasksHealthCheck
+from server.healthcheck_methods.queues import (
+    AsyncQueueDepthMonitor,
+    QueueDepthHealthCheck,
+)
+from server.healthcheck_methods.runner import run_checks
+from server.healthcheck_methods.workers import WorkersHealthCheck
+from server.utils import BeatCheckConfig, QueuesCheckConfig, WorkersCheckConfig
+
+
+class SleepingCheck(AsyncBaseHealthCheckBackend):
+    def __init__(self, delay: float, error: Exception | None = None):
+        super().__init__()
+        self.delay = delay
+        self.error = error
+
+    async def check_status(self):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+
+def ago(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=seconds)
+
+
+def epoch_ms(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+
+async def test_checks_run_concurrently():
+    backends = [SleepingCheck(0.05) for _ in range(100)]
+    loop = asyncio.get_running_loop()
+
+    started_at = loop.time()
+    status = await run_checks(backends, deadline=5)
+
+    assert status == 200
+    assert loop.time() - started_at < 0.5
+    assert all(backend.time_taken >= 0.05 for backend in backends)
+
+
+async def test_overdue_check_times_out():
+    fast, slow = SleepingCheck(0), SleepingCheck(3600)
+
+    status = await run_checks([fast, slow], deadline=0.05)
+
+    assert status == 500
+    assert not fast.errors
+    assert slow.pretty_status == "The check did not finish before the deadline"
+    assert slow.time_taken < 1
+
+
+async def test_raising_check_is_isolated():
+    ok = SleepingCheck(0)
+    broken = SleepingCheck(0, error=ConnectionError("Redis is unreachable"))
+    broken.critical_service = False
+
+    status = await run_checks([ok, broken], deadline=5)
+
+    assert status == 200
+    assert not ok.errors
+    assert "Redis is unreachable" in broken.pretty_status
+
+
+async def test_failed_critical_check():
+    failed = SleepingCheck(0, error=HealthCheckException("down"))
+
+    assert await run_checks([failed, SleepingCheck(0)], deadline=5) == 500
+    assert failed.pretty_status == "down"
+
+
+async def test_workers_check_keys_layout(redis_pool, redis, config):
+    await redis.set("alive", ago(1).isoformat())
+    await redis.set("inactive", ago(60).isoformat())
+    check = WorkersHealthCheck(
+        redis_pool,
+        config.redis,
+        WorkersCheckConfig(hostnames=["alive", "inactive", "gone"]),
+    )
+
+    await check.run_check()
+
+    assert check.pretty_status.splitlines() == [
+        "Worker gone once started,  is no longer active",
+        "Worker inactive has been inactive more than 30 seconds",
+    ]
+
+
+async def test_workers_check_hash_layout(redis_pool, redis, config):
+    config.redis.storage_layout = "hash"
+    # Ready records are older than the storage ttl, they must not expire
+    await redis.hset(
+        "healthcheck:ready",
+        mapping={"alive": epoch_ms(ago(86400)), "gone": epoch_ms(ago(86400))},
+    )
+    await redis.hset("healthcheck:workers", mapping={"alive": epoch_ms(ago(1))})
+    check = WorkersHealthCheck(redis_pool, config.redis, WorkersCheckConfig())
+
+    await check.run_check()
+
+    assert check.pretty_status == "Worker gone once started,  is no longer active"
+
+
+async def test_workers_check_without_expected_workers(redis_pool, config):
+    check = WorkersHealthCheck(redis_pool, config.redis, WorkersCheckConfig())
+
+    assert await check.run_check() == 200
+    assert not check.errors
+
+
+async def test_beat_check(redis_pool, redis, config):
+    await redis.set("on-time", ago(5).isoformat())
+    await redis.set("late", ago(120).isoformat())
+    check = BeatTasksHealthCheck(
+        redis_pool,
+        config.redis,
+        BeatCheckConfig(
+            tasks={"on-time": 10, "late": 60, "expired": 60, "rare": 86400}
+        ),
+    )
+
+    await check.run_check()
+
+    assert check.pretty_status.splitlines() == [
+        "Sheduled task late has not run for too long",
+        "Sheduled task expired has not run for too long",
+    ]
+
+
+@pytest.fixture
+def broker():
+    monitor = AsyncQueueDepthMonitor("redis://localhost:6379/0", trend_window=60)
+    monitor.client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    return monitor
+
+
+def message(tag: str) -> str:
+    return json.dumps({"properties": {"delivery_tag": tag}})
+
+
+async def test_queue_depth(broker):
+    await broker.client.lpush("celery", message("first"), message("second"))
+    check = QueueDepthHealthCheck(
+        broker, QueuesCheckConfig(queues=["celery", "empty"], max_depth=1)
+    )
+
+    await check.run_check()
+
+    assert check.depths["celery"].depth == 2
+    assert check.depths["empty"].depth == 0
+    assert check.pretty_status == (
+        "2 messages are waiting in the queue celery, more than 1"
+    )
+
+
+async def test_queue_lag_and_growth(broker):
+    await broker.client.lpush("celery", message("first"))
+    await broker.measure(["celery"])
+    await asyncio.sleep(0.05)
+    await broker.client.lpush("celery", message("second"))
+
+    depth = (await broker.measure(["celery"]))["celery"]
+
+    assert depth.depth == 2
+    assert depth.lag >= 0.05
+    assert depth.growth > 0
+
+    await broker.client.rpop("celery")
+    assert (await broker.measure(["celery"]))["celery"].lag == 0
+
+
+async def test_healthcheck_reports_time_taken(aiohttp_client, app, redis, config):
+    config.checks.beat.tasks = {"late": 60}
+    await redis.set("late", ago(120).isoformat())
+    client = await aiohttp_client(app)
+
+    response = await client.get("/healthcheck")
+
+    # The beat check is not critical
+    assert response.status == 200
+    data = await response.json()
+    assert data["Status"] == "Sheduled task late has not run for too long"
+    assert set(data["checks"]) == {
+        "CeleryPingBackend",
+        "WorkersHealthCheck",
+        "BeatTasksHealthCheck",
+    }
+    assert all(check["time_taken"] >= 0 for check in data["checks"].values())
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import signal
+
+import pytest
+from aiohttp import web
+
+from server.cache import HealthcheckCache
+from server.main import setup_reload
+from server.utils import Config, ConfigStore, config_store
+
+CONFIG = """
+celery:
+  broker: memory://
+  backend: cache+memory://
+cache_ttl: {cache_ttl}
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG.format(cache_ttl=2))
+    return path
+
+
+def test_config_is_loaded_once(config_file, monkeypatch):
+    store = ConfigStore(config_file)
+    loads = []
+    load = Config.load.__func__
+
+    def counting_load(cls, filepath):
+        loads.append(filepath)
+        return load(cls, filepath)
+
+    monkeypatch.setattr(Config, "load", classmethod(counting_load))
+
+    for _ in range(100):
+        store.current
+
+    assert loads == [config_file]
+
+
+def test_shipped_config_is_valid():
+    assert Config.load().checks.queues.queues
+
+
+def test_reload_replaces_config(config_file):
+    store = ConfigStore(config_file)
+    config = store.current
+
+    config_file.write_text(CONFIG.format(cache_ttl=5))
+    reloaded = store.reload()
+
+    assert reloaded is store.current
+    assert reloaded is not config
+    assert (config.cache_ttl, reloaded.cache_ttl) == (2, 5)
+
+
+@pytest.mark.parametrize("content", ["celery: [", "celery: {broker: memory://}"])
+def test_invalid_config_keeps_previous(config_file, content):
+    store = ConfigStore(config_file)
+    config = store.current
+
+    config_file.write_text(content)
+
+    assert store.reload() is config
+    assert store.current is config
+
+
+async def test_sighup_reloads_config(config_file, monkeypatch):
+    store = ConfigStore(config_file)
+    monkeypatch.setattr(config_store, "_config", store.current)
+    monkeypatch.setattr(config_store, "filepath", config_file)
+    app = web.Application()
+    cache = HealthcheckCache(None, ttl=2)
+    setup_reload(app, cache)
+    for on_startup in app.on_startup:
+        await on_startup(app)
+
+    config_file.write_text(CONFIG.format(cache_ttl=5))
+    os.kill(os.getpid(), signal.SIGHUP)
+    await asyncio.sleep(0.01)
+
+    for on_cleanup in app.on_cleanup:
+        await on_cleanup(app)
+    assert config_store.current.cache_ttl == 5
+    assert cache.ttl == 5
@@ -0,0 +1,38 @@
+import asyncio
+
+from kombu import Connection
+
+from server.healthcheck_methods.ping import CeleryPingBackend
+
+
+async def test_celery_app_is_built_once(aiohttp_client, app):
+    celery_app = app["celery"]
+    client = await aiohttp_client(app)
+
+    for _ in range(3):
+        await client.get("/healthcheck")
+
+    assert app["celery"] is celery_app
+
+
+async def test_pings_reuse_broker_connections(app, config, monkeypatch):
+    # Kombu's in-memory transport, no worker replies to wait for
+    pool = app["celery"].pool
+    established = []
+    establish = Connection._establish_connection
+
+    def counting_establish(connection):
+        established.append(connection)
+        return establish(connection)
+
+    monkeypatch.setattr(Connection, "_establish_connection", counting_establish)
+    backends = [
+        CeleryPingBackend(app["celery"], config.celery) for _ in range(200)
+    ]
+
+    statuses = await asyncio.gather(*(backend.run_check() for backend in backends))
+
+    assert set(statuses) == {200}
+    assert app["celery"].pool is pool
+    # Connections are opened up to the pool limit, then reused
+    assert 0 < len(established) <= pool.limit
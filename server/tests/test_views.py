@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from server.healthcheck_methods.base import HealthCheckException
+from server.healthcheck_methods.ping import CeleryPingBackend
+
+
+async def test_concurrent_requests_ping_once(aiohttp_client, app, monkeypatch):
+    pings = []
+
+    async def ping_celery(self):
+        pings.append(self)
+        await asyncio.sleep(0.05)
+        return [{"worker": {"ok": "pong"}}]
+
+    monkeypatch.setattr(CeleryPingBackend, "ping_celery", ping_celery)
+    client = await aiohttp_client(app)
+
+    responses = await asyncio.gather(*(client.get("/healthcheck") for _ in range(100)))
+
+    assert {response.status for response in responses} == {200}
+    assert len(pings) == 1
+
+
+async def test_failed_check_returns_json_500(aiohttp_client, app, monkeypatch):
+    async def ping_celery(self):
+        raise HealthCheckException("The ping has stalled on the broker")
+
+    monkeypatch.setattr(CeleryPingBackend, "ping_celery", ping_celery)
+    client = await aiohttp_client(app)
+
+    response = await client.get("/healthcheck")
+
+    assert response.status == 500
+    data = await response.json()
+    assert data["Status"] == "The ping has stalled on the broker"
+    assert data["checks"]["CeleryPingBackend"]["status"] == data["Status"]
+
+
+async def test_cached_requests_per_second(
+    aiohttp_client, app, monkeypatch, record_property
+):
+    pings = []
+
+    async def ping_celery(self):
+        pings.append(self)
+        return []
+
+    monkeypatch.setattr(CeleryPingBackend, "ping_celery", ping_celery)
+    client = await aiohttp_client(app)
+    requests = 500
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get("/healthcheck")
+        assert response.status == 200
+    elapsed = time.perf_counter() - started_at
+
+    record_property("requests_per_second", round(requests / elapsed))
+    # The broker is pinged once per cache_ttl, whatever the request rate
+    assert len(pings) == 1
@@ -2,7 +2,7 @@ import yaml
 from typing import Optional
 
 from pathlib import Path
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from loguru import logger
 
@@ -21,11 +21,57 @@ class RedisConfig(BaseModel):
     db: int
     minsize: int
     maxsize: int
+    # Database EventsCamera writes the health records to
+    storage_db: int = 5
+    # Same as HEALTHCHECK_STORAGE_LAYOUT of the project, "keys" or "hash"
+    storage_layout: str = "keys"
+    # Same as HEALTHCHECK_STORAGE_TTL of the project, seconds
+    storage_ttl: Optional[int] = 2000
 
 
 class CeleryConfig(BaseModel):
     broker: str
     backend: str
+    # Seconds to wait for ping replies
+    ping_timeout: float = 0.5
+    # Stop waiting as soon as this many workers have replied
+    expected_workers: Optional[int] = None
+    # Ping from the event loop instead of a thread, Redis brokers only
+    native_ping: bool = True
+
+
+class WorkersCheckConfig(BaseModel):
+    # Seconds since the last heartbeat a worker is considered inactive after
+    timeout: float = 30
+    # Workers expected to be alive, the ready records are used when empty,
+    # which are only in Redis with the "hash" storage layout
+    hostnames: list[str] = []
+
+
+class BeatCheckConfig(BaseModel):
+    # Run intervals of the periodic tasks in seconds, by task name,
+    # the database of the schedule is not reachable from here
+    tasks: dict[str, float] = {}
+    # Same as HEALTHCHECK_PROBE_INTERVAL of the project, seconds
+    probe_interval: float = 2
+
+
+class QueuesCheckConfig(BaseModel):
+    queues: list[str] = ["celery"]
+    # Thresholds of the backlog warnings, none disables a warning
+    max_depth: Optional[int] = 10000
+    max_lag: Optional[float] = 60
+    max_growth: Optional[float] = None
+    # Seconds the growth of a queue is measured over
+    trend_window: float = 60
+
+
+class ChecksConfig(BaseModel):
+    # Seconds all the checks of a request have to finish in
+    deadline: float = 5
+    workers: WorkersCheckConfig = WorkersCheckConfig()
+    beat: BeatCheckConfig = BeatCheckConfig()
+    queues: QueuesCheckConfig = QueuesCheckConfig()
 
 
 class Config(BaseModel):
@@ -33,9 +79,49 @@ class Config(BaseModel):
     celery: Optional[CeleryConfig]
     host: Optional[str]
     port: Optional[int]
+    # Seconds a healthcheck result is served to the requests
+    cache_ttl: float = 2.0
+    # Seconds between background healthchecks, none when not set
+    refresh_interval: Optional[float] = 1.0
+    checks: ChecksConfig = ChecksConfig()
 
     @classmethod
     def load(cls, filepath: Path = CONFIG_PATH):
         with open(filepath, "rt") as f:
             data = yaml.safe_load(f)
         return cls.parse_obj(data)
+
+
+class ConfigStore:
+    """
+    Holds the process-wide config. The file is read and validated once,
+    `reload` replaces the whole object, so readers see either the old or
+    the new config, never a mix of them.
+    """
+
+    def __init__(self, filepath: Path = CONFIG_PATH):
+        self.filepath = filepath
+        self._config: Config | None = None
+
+    @property
+    def current(self) -> Config:
+        if self._config is None:
+            self._config = Config.load(self.filepath)
+        return self._config
+
+    def reload(self) -> Config:
+        try:
+            config = Config.load(self.filepath)
+        except (OSError, yaml.YAMLError, ValidationError):
+            logger.exception(f"Can not reload {self.filepath}, keeping the config")
+            return self.current
+        self._config = config
+        logger.info(f"{self.filepath} has been reloaded")
+        return config
+
+
+config_store = ConfigStore()
+
+
+def get_config() -> Config:
+    return config_store.current
@@ -1,18 +1,65 @@
+import asyncio
+
 from aiohttp import web
 from loguru import logger
 
+from .cache import CheckResult
+from .healthcheck_methods.base import AsyncBaseHealthCheckBackend
+from .healthcheck_methods.beat import BeatTasksHealthCheck
 from .healthcheck_methods.ping import CeleryPingBackend
+from .healthcheck_methods.queues import QueueDepthHealthCheck
+from .healthcheck_methods.runner import run_checks
+from .healthcheck_methods.workers import WorkersHealthCheck
+from .utils import Config, get_config
 
 
-async def healthcheck(request: web.Request) -> web.Response:
-    logger.info("Healthcheck requested.")
+def get_backends(
+    app: web.Application, config: Config
+) -> list[AsyncBaseHealthCheckBackend]:
+    backends = [
+        CeleryPingBackend(
+            app["celery"],
+            config.celery,
+            broadcast=app["broadcast_ping"],
+        )
+    ]
+    # The pool is only set up when Redis was configured at startup
+    if config.redis and "redis" in app:
+        backends += [
+            WorkersHealthCheck(app["redis"], config.redis, config.checks.workers),
+            BeatTasksHealthCheck(app["redis"], config.redis, config.checks.beat),
+        ]
+    if app["queue_depth"]:
+        backends.append(QueueDepthHealthCheck(app["queue_depth"], config.checks.queues))
+    return backends
+
 
-    celery_ping = CeleryPingBackend()
+async def run_healthcheck(app: web.Application) -> CheckResult:
+    logger.info("Healthcheck is running.")
 
-    status = await celery_ping.run_check()
+    # The same config all along the run, even if reloaded meanwhile
+    config = get_config()
+    backends = get_backends(app, config)
+    status = await run_checks(backends, deadline=config.checks.deadline)
 
-    if status:
-        response = celery_ping.pretty_status
-        data = {"Status": response}
-        return web.json_response(data, status=status)
+    errors = [backend.pretty_status for backend in backends if backend.errors]
+    data = {
+        "Status": "\n".join(errors) or "OK",
+        "checks": {
+            backend.identifier(): {
+                "status": backend.pretty_status,
+                "time_taken": round(backend.time_taken, 3),
+            }
+            for backend in backends
+        },
+    }
+    return CheckResult(
+        status=status, data=data, checked_at=asyncio.get_running_loop().time()
+    )
+
+
+async def healthcheck(request: web.Request) -> web.Response:
+    logger.info("Healthcheck requested.")
 
+    result = await request.app["healthcheck_cache"].get()
+    return web.json_response(result.data, status=result.status)